@@ -0,0 +1,111 @@
+# -*- coding:utf8 -*-
+"""
+api.py is the Python interface of the solver: solve a puzzle and get the result back, without printing or
+saving any file
+"""
+from solver import Solver
+from moves import MoveTable
+
+# searches: command name -> (Solver method, whether it takes a heuristic, its extra options)
+ALGORITHMS = {
+    'BFS': ('search_BFS', True, []),
+    'ASTAR': ('search_Astar', True, []),
+    'IDASTAR': ('search_IDAstar', True, []),
+    'WASTAR': ('search_WAstar', True, ['weight']),
+    'ARASTAR': ('search_ARAstar', True, ['weight', 'step', 'bound']),
+    'GREEDY': ('search_Greedy', True, []),
+    'BIBFS': ('search_BiBFS', False, []),
+    'BIASTAR': ('search_BiAstar', True, []),
+    'LBFS': ('search_LayeredBFS', False, ['memory', 'directory']),
+    'DFS': ('search_DFS', False, ['path_only', 'table'])
+}
+
+# default values of the options of the searches
+OPTIONS = {'weight': 2.0, 'step': 0.5, 'bound': 1.0, 'memory': None, 'directory': None, 'limit': None,
+           'workers': None, 'path_only': False, 'table': None}
+
+
+class SolveResult:
+
+    # the outcome of solve()
+    # `status` is `solved`, `exhausted` (the iteration or timeout budget ran out first) or `unsolvable`
+    # `path` is the list of flat boards from the initial to the goal state (empty unless solved)
+    # `nodes` is the number of expanded nodes and `metrics` the SearchMetrics of the search (None if unsolvable)
+    def __init__(self, status, path, nodes, metrics, width):
+        self.status = status
+        self.path = path
+        self.nodes = nodes
+        self.metrics = metrics
+        self.__width = width
+
+    # number of moves of the solution, None unless solved
+    def get_moves(self):
+        return len(self.path) - 1 if self.path else None
+
+    # the names of the moves of the solution (see MoveTable.NAMES), i.e. ['U', 'UR', 'L']
+    def get_directions(self):
+        return MoveTable.directions([bytes(state) for state in self.path], self.__width)
+
+    def to_dict(self):
+        result = {'status': self.status, 'nodes': self.nodes}
+        if self.metrics is not None:
+            result['metrics'] = self.metrics.to_dict()
+        if self.path:
+            result['moves'] = self.get_moves()
+            result['path'] = self.path
+        return result
+
+
+# check that both states are permutations of the tiles 0 .. width * height - 1
+def valid_states(init_state, goal_state, width, height):
+    tiles = list(range(width * height))
+    return sorted(init_state) == tiles and sorted(goal_state) == tiles
+
+
+# solve a puzzle and return a SolveResult
+# `algorithm` is one of ALGORITHMS, `heuristic` is `h1`, `h2` or `pdb` (`pdb` when only `pattern_database` is
+# given), ignored by DFS, BIBFS and LBFS
+# `pattern_database` is the path of a pattern database file or a loaded PatternDatabase, `cache` a SolutionCache
+# or the path of its file, `sink` an optional ResultSink the solution is written to
+# `canonical` solves the canonical form of the instance, sharing the cache with its symmetric and relabeled
+# variants (see Solver)
+# `profile` measures the time of the phases of the search in the metrics, which slows it down (see Solver)
+# `options` are the extra options of the search: `weight`, `step` and `bound` (WASTAR, ARASTAR), `memory` and
+# `directory` (LBFS), `limit`, `path_only` and `table` (DFS, see Solver.search_DFS) and `workers` (ASTAR, parallel
+# HDA*)
+# raises ValueError on invalid states, an unknown algorithm or option, or a missing heuristic
+def solve(init_state, goal_state, width, height, algorithm='ASTAR', heuristic=None, iteration=1000, timeout=None,
+          move_set='8', pattern_database=None, cache=None, backend='python', sink=None, progress=None,
+          verbose=False, canonical=False, profile=False, **options):
+    if not valid_states(init_state, goal_state, width, height):
+        raise ValueError('The states must both hold the tiles 0 to ' + str(width * height - 1))
+    if algorithm not in ALGORITHMS:
+        raise ValueError('Unknown algorithm: ' + str(algorithm))
+    unknown = set(options) - set(OPTIONS)
+    if unknown:
+        raise ValueError('Unknown options: ' + ', '.join(sorted(unknown)))
+    options = dict(OPTIONS, **options)
+    method, informed, names = ALGORITHMS[algorithm]
+    if informed:
+        if heuristic is None and pattern_database is not None:
+            heuristic = 'pdb'
+        if heuristic not in ['h1', 'h2', 'pdb']:
+            raise ValueError(algorithm + ' needs a heuristic function: h1, h2 or pdb')
+        if heuristic == 'pdb' and pattern_database is None:
+            raise ValueError('The pdb heuristic needs a pattern database')
+    s = Solver(init_state, goal_state, width, pattern_database=pattern_database, timeout=timeout, verbose=verbose,
+               progress=progress, move_set=move_set, cache=cache, sink=sink, backend=backend, canonical=canonical,
+               profile=profile)
+    if not s.is_solvable():
+        return SolveResult('unsolvable', [], 0, None, width)
+    if algorithm == 'DFS' and options['limit'] is not None:
+        metrics = s.search_IDDFS(limit=options['limit'], iteration=iteration, table=options['table'])
+    elif algorithm == 'ASTAR' and options['workers'] is not None:
+        metrics = s.search_HDAstar(heuristic, iteration=iteration, workers=options['workers'])
+    else:
+        arguments = {name: options[name] for name in names}
+        if informed:
+            arguments['heuristic_type'] = heuristic
+        metrics = getattr(s, method)(iteration=iteration, **arguments)
+    path = [[tile for row in state for tile in row] for state in s.get_path()]
+    return SolveResult('solved' if path else 'exhausted', path, s.get_steps(), metrics, width)
@@ -0,0 +1,123 @@
+# -*- coding:utf8 -*-
+"""
+batch.py solves many puzzles in a pool of worker processes
+"""
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from api import solve, valid_states
+from cache import SolutionCache
+import json
+import os
+import time
+
+
+# parse one line of the batch input into an instance
+# a line is either JSON, i.e. {"id": "a", "init": [1, 0, 3, 2], "goal": [1, 2, 3, 0]},
+# or the initial and goal states separated by a space, i.e. `1,0,3,2 1,2,3,0`
+# instances without an id are numbered by their line
+# raises ValueError or KeyError on a malformed line
+def parse_instance(line, number):
+    if line.startswith('{'):
+        instance = json.loads(line)
+        init_state, goal_state = instance['init'], instance['goal']
+        number = instance.get('id', number)
+    else:
+        init_state, goal_state = line.split()
+    if isinstance(init_state, str):
+        init_state = [int(tile) for tile in init_state.split(',')]
+    if isinstance(goal_state, str):
+        goal_state = [int(tile) for tile in goal_state.split(',')]
+    for state in [init_state, goal_state]:
+        if not isinstance(state, list) or not all(isinstance(tile, int) and not isinstance(tile, bool)
+                                                  for tile in state):
+            raise ValueError('The init and goal states must be lists of tiles')
+    return {'id': number, 'init': init_state, 'goal': goal_state}
+
+
+# solve one instance in a worker process and return its result as a dict
+# `algorithm` is one of the search subcommands: BFS, ASTAR, IDASTAR, BIBFS, BIASTAR, DFS, WASTAR, ARASTAR or GREEDY
+# `weight` and `step` are the weight of h(n) of WASTAR and ARASTAR and its decrease after each round of ARASTAR
+# `canonical` solves the canonical form of the instance (see Symmetry)
+# `timeout` (in seconds) and `iteration` bound the search of this instance only
+# `cache` is the path of the SolutionCache file shared by the workers, or None
+# `sink` is how the solution path is reported: `jsonl` every board, `moves` the move names or `null` nothing
+def solve_instance(instance, width, height, algorithm, heuristic_type, iteration, timeout, pattern_database,
+                   move_set='8', cache=None, cache_size=None, sink='jsonl', weight=2.0, step=0.5,
+                   canonical=False):
+    tic = time.perf_counter()
+    result = {'id': instance['id']}
+    solution_cache = None
+    try:
+        if not valid_states(instance['init'], instance['goal'], width, height):
+            result['status'] = 'invalid'
+            return result
+        if cache is not None:
+            solution_cache = SolutionCache(cache, cache_size)
+        solution = solve(instance['init'], instance['goal'], width, height, algorithm, heuristic=heuristic_type,
+                         iteration=iteration, timeout=timeout, move_set=move_set, pattern_database=pattern_database,
+                         cache=solution_cache, canonical=canonical, weight=weight, step=step)
+    except Exception as error:
+        result['status'] = 'error'
+        result['error'] = str(error)
+        return result
+    finally:
+        if solution_cache is not None:
+            solution_cache.close()
+    # `exhausted` means the iteration or timeout budget ran out before a solution was found
+    result['status'] = solution.status
+    if solution.status == 'unsolvable':
+        return result
+    result['nodes'] = solution.nodes
+    result['time'] = time.perf_counter() - tic
+    result['metrics'] = solution.metrics.to_dict()
+    if solution.path:
+        result['moves'] = solution.get_moves()
+        if sink == 'jsonl':
+            result['path'] = solution.path
+        elif sink == 'moves':
+            result['directions'] = ' '.join(solution.get_directions())
+    return result
+
+
+# solve the instances read from `lines` with `workers` processes
+# results are written to `output` as JSON lines in completion order, not in input order
+# at most a few instances per worker are queued at a time, so the input can be streamed
+def run_batch(lines, output, width, height, algorithm, heuristic_type=None, iteration=1000, timeout=None,
+              workers=None, pattern_database=None, move_set='8', cache=None, cache_size=None, sink='jsonl',
+              weight=2.0, step=0.5, canonical=False):
+    workers = os.cpu_count() or 1 if workers is None else workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        window = 4 * workers
+        # future -> id of its instance
+        pending = {}
+        for number, line in enumerate(lines):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                instance = parse_instance(line, number)
+            except (ValueError, KeyError) as error:
+                output.write(json.dumps({'id': number, 'status': 'invalid', 'error': str(error)}) + '\n')
+                continue
+            future = executor.submit(solve_instance, instance, width, height, algorithm, heuristic_type, iteration,
+                                     timeout, pattern_database, move_set, cache, cache_size, sink, weight, step,
+                                     canonical)
+            pending[future] = instance['id']
+            if len(pending) >= window:
+                pending = write_finished(pending, output)
+        while pending:
+            pending = write_finished(pending, output)
+
+
+# wait for at least one instance to finish, write the finished results and return the pending ones
+# an instance whose worker failed (i.e. the process died) gets an `error` result instead of stopping the batch
+def write_finished(pending, output):
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        number = pending.pop(future)
+        try:
+            result = future.result()
+        except Exception as error:
+            result = {'id': number, 'status': 'error', 'error': str(error)}
+        output.write(json.dumps(result) + '\n')
+    output.flush()
+    return pending
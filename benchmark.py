@@ -0,0 +1,392 @@
+# -*- coding:utf8 -*-
+"""
+benchmark.py is the reproducible benchmark of the searches over puzzle sizes
+"""
+from argparse import ArgumentParser
+from solver import Solver
+from moves import MoveTable
+from pattern_database import PatternDatabase
+from collections import deque
+import multiprocessing
+import statistics
+import tempfile
+import resource
+import random
+import time
+import json
+import sys
+import os
+
+# puzzle sizes (width, height) and the optimal solution depth of their instances for each move set
+# the depths grow with the board, so the larger sizes take long enough to measure
+SIZES = {
+    '2x2': (2, 2, {'8': 3, '4': 6}),
+    '3x2': (3, 2, {'8': 8, '4': 14}),
+    '3x3': (3, 3, {'8': 12, '4': 20}),
+    '4x3': (4, 3, {'8': 14, '4': 24}),
+    '4x4': (4, 4, {'8': 16, '4': 28})
+}
+
+# tiles per group of the pattern databases of the pdb strategies, small enough to build the 4x4 ones in seconds
+PDB_GROUP = 4
+
+# boards visited by the reference workload timed next to every search (see run_reference)
+REFERENCE_BOARDS = 2000
+
+# the fixed parameters of the strategies below, saved in the config of the results
+WEIGHT = 2.0
+STEP = 0.5
+WORKERS = 2
+TABLE = 100000
+
+# search strategies: name -> (Solver method, heuristic type, extra arguments of the method)
+STRATEGIES = {
+    'DFS': ('search_DFS', None, {}),
+    'DFS-pathonly': ('search_DFS', None, {'path_only': True}),
+    'DFS-table': ('search_DFS', None, {'table': TABLE}),
+    'IDDFS': ('search_IDDFS', None, {}),
+    'BFS-h1': ('search_BFS', 'h1', {}),
+    'BFS-h2': ('search_BFS', 'h2', {}),
+    'ASTAR-h1': ('search_Astar', 'h1', {}),
+    'ASTAR-h2': ('search_Astar', 'h2', {}),
+    'HDASTAR-h1': ('search_HDAstar', 'h1', {'workers': WORKERS}),
+    'IDASTAR-h1': ('search_IDAstar', 'h1', {}),
+    'IDASTAR-h2': ('search_IDAstar', 'h2', {}),
+    'WASTAR-h1': ('search_WAstar', 'h1', {'weight': WEIGHT}),
+    'ARASTAR-h1': ('search_ARAstar', 'h1', {'weight': WEIGHT, 'step': STEP}),
+    'GREEDY-h1': ('search_Greedy', 'h1', {}),
+    'LBFS': ('search_LayeredBFS', None, {}),
+    'BIBFS': ('search_BiBFS', None, {}),
+    'BIASTAR-h1': ('search_BiAstar', 'h1', {}),
+    'BIASTAR-h2': ('search_BiAstar', 'h2', {}),
+    'BFS-pdb': ('search_BFS', 'pdb', {}),
+    'ASTAR-pdb': ('search_Astar', 'pdb', {}),
+    'IDASTAR-pdb': ('search_IDAstar', 'pdb', {})
+}
+
+
+# the goal state of the instances of a size
+def goal_of(width, height):
+    return list(range(1, width * height)) + [0]
+
+
+# build the pattern database of the goal of a size in groups of PDB_GROUP tiles
+def build_database(width, height, move_set):
+    tiles = list(range(1, width * height))
+    return PatternDatabase.build(goal_of(width, height), width, height,
+                                 [tiles[idx:idx+PDB_GROUP] for idx in range(0, len(tiles), PDB_GROUP)], move_set)
+
+
+# generate `count` distinct instances whose optimal solution is exactly `depth` moves
+# each instance is a seeded random walk from the goal state, never undoing the previous move,
+# kept only if A* with the pattern database `database` (admissible) confirms its optimal depth
+def generate_instances(width, height, depth, count, seed, database, move_set='8'):
+    rng = random.Random(str(seed) + '-' + str(width) + 'x' + str(height) + '-' + str(depth))
+    goal_state = goal_of(width, height)
+    moves = MoveTable.get(width, height, move_set)
+    instances = []
+    attempts = 0
+    while len(instances) < count:
+        attempts += 1
+        if attempts > 1000 * count:
+            raise ValueError('Cannot find ' + str(count) + ' instances at depth ' + str(depth) + ' for ' +
+                             str(width) + 'x' + str(height))
+        state = goal_state[:]
+        previous = None
+        for _ in range(depth):
+            blank = state.index(0)
+            previous, target = rng.choice([(move, target) for move, target in moves.get_neighbours(blank)
+                                           if previous is None or move != MoveTable.inverse(previous)])
+            state[blank], state[target] = state[target], 0
+        if state in instances:
+            continue
+        solver = Solver(state, goal_state, width, pattern_database=database, verbose=False, move_set=move_set)
+        if solver.search_Astar('pdb', iteration=10 ** 7).solution_length == depth:
+            instances.append(state)
+    return [(instance, goal_state) for instance in instances]
+
+
+# a fixed breadth-first search over 3x3 boards written without the solver, timed next to every search
+# the speed of the machine drifts during a benchmark, the times relative to this one don't (the solver's code
+# must stay out of it, or a regression of the solver would slow the reference as well)
+# returns the time it took in seconds
+def run_reference():
+    tic = time.perf_counter()
+    start = bytes(range(1, 9)) + b'\x00'
+    seen = {start}
+    queue = deque([start])
+    while queue and len(seen) < REFERENCE_BOARDS:
+        board = queue.popleft()
+        blank = board.index(0)
+        x, y = blank % 3, blank // 3
+        for target_x, target_y in [(x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)]:
+            if 0 <= target_x < 3 and 0 <= target_y < 3:
+                target = target_y * 3 + target_x
+                child = bytearray(board)
+                child[blank], child[target] = child[target], 0
+                child = bytes(child)
+                if child not in seen:
+                    seen.add(child)
+                    queue.append(child)
+    return time.perf_counter() - tic
+
+
+# run one strategy on one instance, meant to run in a fresh process so its peak RSS is its own
+# the search runs until the runs add up to `min_time` seconds, so a fast case isn't timed on a single run,
+# in rounds of a reference run (see run_reference), as many searches as fit in its time, then reference runs
+# until they took as long as the searches
+# the `total_time` reported is the median of the runs and `relative_time` the median over the rounds of the
+# mean search time divided by the mean reference time (both spans of about the same length, so a pause of the
+# machine weighs the same on each)
+# `pattern_database` is the path of the database file of the goal, used by the pdb strategies
+def run_case(width, init_state, goal_state, strategy, iteration, timeout, depth, move_set='8', pattern_database=None,
+             min_time=0.0):
+    method, heuristic_type, arguments = STRATEGIES[strategy]
+    arguments = dict(arguments)
+    if heuristic_type is not None:
+        arguments['heuristic_type'] = heuristic_type
+    database = None
+    if heuristic_type == 'pdb':
+        goal_position = [0] * len(goal_state)
+        for idx, tile in enumerate(goal_state):
+            goal_position[tile] = idx
+        database = PatternDatabase.load(pattern_database, goal_position, width, move_set)
+    times = []
+    ratios = []
+    while not times or sum(times) < min_time:
+        references = [run_reference()]
+        spent = []
+        while not spent or sum(spent) < references[0]:
+            solver = Solver(init_state, goal_state, width, pattern_database=database, timeout=timeout,
+                            verbose=False, move_set=move_set)
+            if method == 'search_IDDFS':
+                metrics = solver.search_IDDFS(limit=depth + 1, iteration=iteration)
+            else:
+                metrics = getattr(solver, method)(iteration=iteration, **arguments)
+            spent.append(metrics.total_time)
+        while sum(references) < sum(spent):
+            references.append(run_reference())
+        times += spent
+        ratios.append(sum(spent) / len(spent) / (sum(references) / len(references)))
+    result = metrics.to_dict()
+    result['total_time'] = statistics.median(times)
+    result['relative_time'] = statistics.median(ratios)
+    result['runs'] = len(times)
+    # ru_maxrss is in kilobytes on Linux, the largest worker of HDA* counts as well
+    result['peak_rss'] = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                             resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return result
+
+
+# the target of the process of a case, sends the result of run_case (or its exception) through `connection`
+def run_case_process(connection, arguments):
+    try:
+        connection.send(run_case(*arguments))
+    except Exception as error:
+        connection.send(error)
+    connection.close()
+
+
+# run one case in a new process, so its peak RSS is its own (see run_case)
+# unlike the workers of a multiprocessing Pool the process isn't a daemon, so HDA* can start its own workers
+def run_isolated(context, arguments):
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=run_case_process, args=(sender, arguments))
+    process.start()
+    sender.close()
+    result = receiver.recv()
+    process.join()
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+# run every strategy on every instance of every size and aggregate the results per (size, strategy)
+# each instance runs in `repeat` processes and keeps the median of their times (see run_case), the speed of a
+# process varies more than the runs within it
+def run_benchmark(sizes, strategies, count, seed, iteration, timeout, move_set='8', repeat=1, min_time=0.0):
+    results = {}
+    # the layout of the sets and dicts of the searches depends on the hash seed, fix it for every process
+    os.environ['PYTHONHASHSEED'] = '0'
+    # every case runs in a new process, so the peak RSS of one case doesn't leak into the next
+    context = multiprocessing.get_context('spawn')
+    directory = tempfile.TemporaryDirectory()
+    try:
+        for size in sizes:
+            width, height, depths = SIZES[size]
+            depth = depths[move_set]
+            database = build_database(width, height, move_set)
+            path = os.path.join(directory.name, size + '.pdb')
+            database.save(path)
+            instances = generate_instances(width, height, depth, count, seed, database, move_set)
+            for strategy in strategies:
+                runs = []
+                for init_state, goal_state in instances:
+                    cases = [run_isolated(context, (width, init_state, goal_state, strategy, iteration, timeout, depth,
+                                                    move_set, path, min_time)) for _ in range(repeat)]
+                    run = dict(cases[0])
+                    run['total_time'] = statistics.median(case['total_time'] for case in cases)
+                    run['relative_time'] = statistics.median(case['relative_time'] for case in cases)
+                    run['peak_rss'] = max(case['peak_rss'] for case in cases)
+                    runs.append(run)
+                expansions = sum(run['expansions'] for run in runs)
+                total_time = sum(run['total_time'] for run in runs)
+                relative_time = sum(run['relative_time'] for run in runs)
+                solved = [run for run in runs if run['solved']]
+                results[size + '/' + strategy] = {
+                    'instances': len(runs),
+                    'solved': len(solved),
+                    'expansions': expansions,
+                    'nodes_per_second': expansions / total_time if total_time > 0 else 0.0,
+                    'peak_rss': max(run['peak_rss'] for run in runs),
+                    'solution_length': sum(run['solution_length'] for run in solved) / len(solved) if solved else None,
+                    'time_to_solution': sum(run['total_time'] for run in solved) / len(solved) if solved else None,
+                    # the same in reference runs instead of seconds, compared with the baseline
+                    'relative_nodes_per_second': expansions / relative_time if relative_time > 0 else 0.0,
+                    'relative_time_to_solution': sum(run['relative_time'] for run in solved) / len(solved)
+                    if solved else None
+                }
+                sys.stderr.write(size + '/' + strategy + ' ' + json.dumps(results[size + '/' + strategy]) + '\n')
+    finally:
+        directory.cleanup()
+    return results
+
+
+# compare a run with a baseline, a case regresses when it solves fewer instances, finds longer solutions,
+# or its nodes per second / time to solution are worse than the baseline by more than `tolerance`
+# the speeds are compared relative to the reference workload (see run_reference), the report shows them in seconds
+def compare(baseline, results, tolerance):
+    regressions = []
+    for key, result in sorted(results.items()):
+        if key not in baseline:
+            continue
+        base = baseline[key]
+        reasons = []
+        if result['solved'] < base['solved']:
+            reasons.append('solved ' + str(base['solved']) + ' -> ' + str(result['solved']))
+        if result['solution_length'] is not None and base['solution_length'] is not None and \
+                result['solution_length'] > base['solution_length']:
+            reasons.append('solution length ' + str(base['solution_length']) + ' -> ' + str(result['solution_length']))
+        speed, base_speed = result['relative_nodes_per_second'], base.get('relative_nodes_per_second')
+        if base_speed and speed < base_speed * (1 - tolerance):
+            reasons.append('nodes/s ' + str(int(base['nodes_per_second'])) + ' -> ' +
+                           str(int(result['nodes_per_second'])))
+        if base.get('relative_time_to_solution') and result['relative_time_to_solution'] and \
+                result['relative_time_to_solution'] > base['relative_time_to_solution'] * (1 + tolerance):
+            reasons.append('time to solution ' + '%.4f' % base['time_to_solution'] + 's -> ' +
+                           '%.4f' % result['time_to_solution'] + 's')
+        speedup = speed / base_speed if base_speed else 0.0
+        print(key.ljust(20) + ('%.2fx nodes/s' % speedup).ljust(16) + ('REGRESSION: ' + ', '.join(reasons)
+                                                                         if reasons else 'ok'))
+        if reasons:
+            regressions.append(key)
+    return regressions
+
+
+def create_parser():
+    parser = ArgumentParser(prog="Puzzle Solver Benchmark",
+                            description="Benchmark the searches on seeded random instances")
+    parser.add_argument('-sizes',
+                        dest='sizes',
+                        metavar="3x3,4x3 ...",
+                        action="store",
+                        default=','.join(SIZES),
+                        help="Puzzle sizes (" + ', '.join(SIZES) + ")")
+    parser.add_argument('-strategies',
+                        dest='strategies',
+                        metavar="ASTAR-h1,BIBFS ...",
+                        action="store",
+                        default=','.join(STRATEGIES),
+                        help="Searches to run (" + ', '.join(STRATEGIES) + ")")
+    parser.add_argument('-instances',
+                        dest='instances',
+                        metavar="int",
+                        action="store",
+                        default='3',
+                        help="Number of instances per size")
+    parser.add_argument('-seed',
+                        dest='seed',
+                        metavar="int",
+                        action="store",
+                        default='0',
+                        help="Seed of the instance generator")
+    parser.add_argument('-iteration',
+                        dest='iteration',
+                        metavar="int",
+                        action="store",
+                        default='200000',
+                        help="Maximum iteration of each search")
+    parser.add_argument('-timeout',
+                        dest='timeout',
+                        metavar="seconds",
+                        action="store",
+                        default='10',
+                        help="Maximum time of each search")
+    parser.add_argument('-moves',
+                        dest='move_set',
+                        choices=['8', '4'],
+                        default='8',
+                        help="Move set: 8 (every neighbour of the blank, default) or 4 (no diagonal moves)")
+    parser.add_argument('-repeat',
+                        dest='repeat',
+                        metavar="int",
+                        action="store",
+                        default='3',
+                        help="Number of processes each search runs in, the median of their times is kept")
+    parser.add_argument('-mintime',
+                        dest='min_time',
+                        metavar="seconds",
+                        action="store",
+                        default='0.2',
+                        help="Minimum total time of the runs of each search in a process, fast searches run more "
+                             "often")
+    parser.add_argument('-output',
+                        dest='output',
+                        metavar="file",
+                        action="store",
+                        help="Save the results as a baseline JSON file")
+    parser.add_argument('-compare',
+                        dest='compare',
+                        metavar="file",
+                        action="store",
+                        help="Compare the results with a baseline JSON file, exit with 1 on regressions")
+    parser.add_argument('-tolerance',
+                        dest='tolerance',
+                        metavar="float",
+                        action="store",
+                        default='0.2',
+                        help="Allowed slowdown against the baseline (0.2 is 20%%)")
+    return parser
+
+
+if __name__ == '__main__':
+
+    args = create_parser().parse_args()
+    config = {
+        'sizes': args.sizes.split(','),
+        'strategies': args.strategies.split(','),
+        'instances': int(args.instances),
+        'seed': int(args.seed),
+        'iteration': int(args.iteration),
+        'timeout': float(args.timeout),
+        'moves': args.move_set,
+        'repeat': int(args.repeat),
+        'min_time': float(args.min_time),
+        'weight': WEIGHT,
+        'step': STEP,
+        'workers': WORKERS,
+        'table': TABLE
+    }
+    results = run_benchmark(config['sizes'], config['strategies'], config['instances'], config['seed'],
+                            config['iteration'], config['timeout'], config['moves'], config['repeat'],
+                            config['min_time'])
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump({'config': config, 'results': results}, file, indent=2, sort_keys=True)
+    if args.compare is not None:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if baseline['config'] != config:
+            print('Warning: the baseline was run with a different configuration ' + json.dumps(baseline['config']))
+        if compare(baseline['results'], results, float(args.tolerance)):
+            os._exit(1)
@@ -0,0 +1,105 @@
+# -*- coding:utf8 -*-
+"""
+cache.py is the persistent cache of solutions and lower bounds shared by every run
+"""
+import sqlite3
+import time
+
+
+class SolutionCache:
+
+    # one row per (width, height, move set, initial board, goal board), boards are packed `bytes`
+    # `path` is the optimal solution (the boards concatenated) or NULL when only `bound` is known,
+    # `bound` is the optimal cost when solved, otherwise a proven lower bound of it
+    # `used` is the time of the last lookup or store, the least recently used rows are evicted first
+    # (the index follows the order of eviction)
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS solutions (
+            width INTEGER NOT NULL,
+            height INTEGER NOT NULL,
+            move_set TEXT NOT NULL,
+            init BLOB NOT NULL,
+            goal BLOB NOT NULL,
+            path BLOB,
+            bound INTEGER NOT NULL,
+            used REAL NOT NULL,
+            PRIMARY KEY (width, height, move_set, init, goal)
+        ) WITHOUT ROWID;
+        DROP INDEX IF EXISTS solutions_used;
+        CREATE INDEX IF NOT EXISTS solutions_evict ON solutions (used, bound);
+    '''
+    # the default maximum number of rows
+    CAPACITY = 100000
+    # share of the capacity freed by an eviction, so the next stores don't evict again
+    HEADROOM = 0.1
+
+    # `path` is the SQLite file, it is created if it doesn't exist
+    # the file can be shared by several processes, i.e. the workers of BATCH
+    def __init__(self, path, capacity=None):
+        self.__capacity = SolutionCache.CAPACITY if capacity is None else capacity
+        self.__connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.executescript(SolutionCache.SCHEMA)
+        # an upper bound of the number of rows: counted when opened, then every stored row is added (a replaced
+        # row is counted again), the rows are only counted again when it goes over the capacity
+        self.__rows = self.__count__()
+
+    # look up an instance, returns (path, bound) or None
+    # `path` is the list of boards of the optimal solution, or None when only the lower bound `bound` is known
+    def get(self, width, height, move_set, init_state, goal_state):
+        key = (width, height, move_set, init_state, goal_state)
+        row = self.__connection.execute('SELECT path, bound FROM solutions WHERE width = ? AND height = ? AND '
+                                        'move_set = ? AND init = ? AND goal = ?', key).fetchone()
+        if row is None:
+            return None
+        self.__connection.execute('UPDATE solutions SET used = ? WHERE width = ? AND height = ? AND move_set = ? AND '
+                                  'init = ? AND goal = ?', (time.time(),) + key)
+        path, bound = row
+        if path is not None:
+            cells = len(init_state)
+            path = [path[idx:idx+cells] for idx in range(0, len(path), cells)]
+        return path, bound
+
+    # store the optimal solution `path` (list of boards from the initial to the goal board) of an instance
+    # every board on the path is solved by the rest of the path, so its suffixes are stored as well
+    def put_solution(self, width, height, move_set, path):
+        now = time.time()
+        goal_state = path[-1]
+        rows = [(width, height, move_set, path[idx], goal_state, b''.join(path[idx:]), len(path) - 1 - idx, now)
+                for idx in range(len(path) - 1)]
+        self.__connection.execute('BEGIN IMMEDIATE')
+        self.__connection.executemany('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        self.__rows += len(rows)
+        self.__evict__()
+        self.__connection.execute('COMMIT')
+
+    # store a proven lower bound of the optimal cost of an instance, a known solution or better bound is kept
+    def put_bound(self, width, height, move_set, init_state, goal_state, bound):
+        self.__connection.execute('BEGIN IMMEDIATE')
+        self.__connection.execute('INSERT INTO solutions VALUES (?, ?, ?, ?, ?, NULL, ?, ?) '
+                                  'ON CONFLICT (width, height, move_set, init, goal) DO UPDATE SET '
+                                  'bound = max(bound, excluded.bound), used = excluded.used WHERE path IS NULL',
+                                  (width, height, move_set, init_state, goal_state, bound, time.time()))
+        self.__rows += 1
+        self.__evict__()
+        self.__connection.execute('COMMIT')
+
+    def close(self):
+        self.__connection.close()
+
+    def __count__(self):
+        return self.__connection.execute('SELECT count(*) FROM solutions').fetchone()[0]
+
+    # once the table holds more rows than the capacity, delete the least recently used ones down to HEADROOM
+    # below it. The boards of a path are stored at the same time, the ones closest to the goal go first
+    def __evict__(self):
+        if self.__rows <= self.__capacity:
+            return
+        self.__rows = self.__count__()
+        if self.__rows <= self.__capacity:
+            return
+        excess = self.__rows - int(self.__capacity * (1 - SolutionCache.HEADROOM))
+        self.__connection.execute('DELETE FROM solutions WHERE (width, height, move_set, init, goal) IN '
+                                  '(SELECT width, height, move_set, init, goal FROM solutions '
+                                  'ORDER BY used, bound LIMIT ?)', (excess,))
+        self.__rows -= excess
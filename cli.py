@@ -49,6 +49,75 @@ class Cli:
                                      action="store",
                                      help="Maximum iteration of a search",
                                      required=False)
+        template_parser.add_argument('-timeout',
+                                     dest='timeout',
+                                     metavar="seconds",
+                                     action="store",
+                                     help="Maximum time of a search, WASTAR, ARASTAR and GREEDY return the best path "
+                                          "found so far when it runs out",
+                                     required=False)
+        template_parser.add_argument('-moves',
+                                     dest='move_set',
+                                     choices=['8', '4'],
+                                     default='8',
+                                     help="Move set: 8 (every neighbour of the blank, default) or 4 (no diagonal moves)")
+        template_parser.add_argument('-metrics',
+                                     dest='metrics',
+                                     metavar="file",
+                                     action="store",
+                                     help="Save the statistics of the search as JSON in the file ('-' for stdout)",
+                                     required=False)
+        template_parser.add_argument('-progress',
+                                     dest='progress',
+                                     metavar="int",
+                                     action="store",
+                                     help="Print a progress line to stderr every `int` expanded nodes",
+                                     required=False)
+        template_parser.add_argument('-profile',
+                                     dest='profile',
+                                     action="store_const",
+                                     const=True,
+                                     default=False,
+                                     help="Measure the time of successor generation, heuristic evaluation and open "
+                                          "list operations in -metrics (slows the search down)")
+        template_parser.add_argument('-cache',
+                                     dest='cache',
+                                     metavar="file",
+                                     action="store",
+                                     help="Look up and store optimal solutions in the SQLite cache file",
+                                     required=False)
+        template_parser.add_argument('-cachesize',
+                                     dest='cache_size',
+                                     metavar="int",
+                                     action="store",
+                                     help="Maximum number of boards kept in the cache (100000 by default)",
+                                     required=False)
+        template_parser.add_argument('-canonical',
+                                     dest='canonical',
+                                     action="store_const",
+                                     const=True,
+                                     default=False,
+                                     help="Solve the canonical form of the puzzle (tiles relabeled, board reflected or "
+                                          "rotated), the -pdb must be built with PDB -canonical")
+        template_parser.add_argument('-backend',
+                                     dest='backend',
+                                     choices=['python', 'numpy'],
+                                     default='python',
+                                     help="numpy expands batches of nodes with NumPy in ASTAR and LBFS (NumPy must be "
+                                          "installed)")
+        template_parser.add_argument('-sink',
+                                     dest='sink',
+                                     choices=['text', 'jsonl', 'moves', 'null'],
+                                     default='text',
+                                     help="Output of the solution: text report (default), compact JSON line, "
+                                          "move names only or nothing")
+        template_parser.add_argument('-output',
+                                     dest='output',
+                                     metavar="file",
+                                     action="store",
+                                     help="File to write the solution to ('-' for stdout), the text report is "
+                                          "saved in `puzzle{algorithm}-{heuristic}.txt` by default",
+                                     required=False)
         # BFS command
         bfs_parser = method_parsers.add_parser('BFS',
                                                parents=[template_parser],
@@ -65,6 +134,12 @@ class Cli:
                                 const=True,
                                 default=False,
                                 help="Enable Permutation Heuristic Function")
+        bfs_parser.add_argument('-pdb',
+                                dest='pdb',
+                                metavar="file",
+                                action="store",
+                                default=None,
+                                help="Enable Pattern Database Heuristic Function stored in the file (see PDB)")
         # A* command
         a_parser = method_parsers.add_parser('ASTAR',
                                                parents=[template_parser],
@@ -81,6 +156,169 @@ class Cli:
                                 const=True,
                                 default=False,
                                 help="Enable Permutation Heuristic Function")
+        a_parser.add_argument('-pdb',
+                                dest='pdb',
+                                metavar="file",
+                                action="store",
+                                default=None,
+                                help="Enable Pattern Database Heuristic Function stored in the file (see PDB)")
+        a_parser.add_argument('-workers',
+                                dest='workers',
+                                metavar="int",
+                                action="store",
+                                help="Run hash-distributed A* (HDA*) on `int` worker processes",
+                                required=False)
+        # IDA* command
+        ida_parser = method_parsers.add_parser('IDASTAR',
+                                               parents=[template_parser],
+                                               help='Run IDA* algorithm')
+        ida_parser.add_argument('-h1',
+                                dest='h1',
+                                action="store_const",
+                                const=True,
+                                default=False,
+                                help="Enable Manhattan Heuristic Function")
+        ida_parser.add_argument('-h2',
+                                dest='h2',
+                                action="store_const",
+                                const=True,
+                                default=False,
+                                help="Enable Permutation Heuristic Function")
+        ida_parser.add_argument('-pdb',
+                                dest='pdb',
+                                metavar="file",
+                                action="store",
+                                default=None,
+                                help="Enable Pattern Database Heuristic Function stored in the file (see PDB)")
+        # Weighted A* command
+        wa_parser = method_parsers.add_parser('WASTAR',
+                                              parents=[template_parser],
+                                              help='Run weighted A* algorithm')
+        wa_parser.add_argument('-h1',
+                               dest='h1',
+                               action="store_const",
+                               const=True,
+                               default=False,
+                               help="Enable Manhattan Heuristic Function")
+        wa_parser.add_argument('-h2',
+                               dest='h2',
+                               action="store_const",
+                               const=True,
+                               default=False,
+                               help="Enable Permutation Heuristic Function")
+        wa_parser.add_argument('-pdb',
+                               dest='pdb',
+                               metavar="file",
+                               action="store",
+                               default=None,
+                               help="Enable Pattern Database Heuristic Function stored in the file (see PDB)")
+        wa_parser.add_argument('-weight',
+                               dest='weight',
+                               metavar="float",
+                               action="store",
+                               default='2',
+                               help="Weight of h(n), the path costs at most `weight` times the shortest one "
+                                    "(2 by default)")
+        # ARA* command
+        ara_parser = method_parsers.add_parser('ARASTAR',
+                                               parents=[template_parser],
+                                               help='Run anytime repairing A* (ARA*), improving the path until '
+                                                    'the timeout')
+        ara_parser.add_argument('-h1',
+                                dest='h1',
+                                action="store_const",
+                                const=True,
+                                default=False,
+                                help="Enable Manhattan Heuristic Function")
+        ara_parser.add_argument('-h2',
+                                dest='h2',
+                                action="store_const",
+                                const=True,
+                                default=False,
+                                help="Enable Permutation Heuristic Function")
+        ara_parser.add_argument('-pdb',
+                                dest='pdb',
+                                metavar="file",
+                                action="store",
+                                default=None,
+                                help="Enable Pattern Database Heuristic Function stored in the file (see PDB)")
+        ara_parser.add_argument('-weight',
+                                dest='weight',
+                                metavar="float",
+                                action="store",
+                                default='3',
+                                help="Weight of h(n) in the first round (3 by default)")
+        ara_parser.add_argument('-step',
+                                dest='step',
+                                metavar="float",
+                                action="store",
+                                default='0.5',
+                                help="Decrease of the weight after each round (0.5 by default)")
+        ara_parser.add_argument('-bound',
+                                dest='bound',
+                                metavar="float",
+                                action="store",
+                                default='1',
+                                help="Stop once the path is proven to cost at most `bound` times the shortest one "
+                                     "(1 by default)")
+        # Greedy best-first command
+        greedy_parser = method_parsers.add_parser('GREEDY',
+                                                  parents=[template_parser],
+                                                  help='Run greedy best-first search')
+        greedy_parser.add_argument('-h1',
+                                   dest='h1',
+                                   action="store_const",
+                                   const=True,
+                                   default=False,
+                                   help="Enable Manhattan Heuristic Function")
+        greedy_parser.add_argument('-h2',
+                                   dest='h2',
+                                   action="store_const",
+                                   const=True,
+                                   default=False,
+                                   help="Enable Permutation Heuristic Function")
+        greedy_parser.add_argument('-pdb',
+                                   dest='pdb',
+                                   metavar="file",
+                                   action="store",
+                                   default=None,
+                                   help="Enable Pattern Database Heuristic Function stored in the file (see PDB)")
+        # Layered BFS command
+        lbfs_parser = method_parsers.add_parser('LBFS',
+                                                parents=[template_parser],
+                                                help='Run layered BFS, keeping only the frontiers in memory')
+        lbfs_parser.add_argument('-memory',
+                                 dest='memory',
+                                 metavar="int",
+                                 action="store",
+                                 help="Maximum number of boards generated in memory, above it the layers spill to disk",
+                                 required=False)
+        lbfs_parser.add_argument('-directory',
+                                 dest='directory',
+                                 metavar="dir",
+                                 action="store",
+                                 help="Directory of the spilled layers (the system temporary directory by default)",
+                                 required=False)
+        # Bidirectional BFS command
+        bibfs_parser = method_parsers.add_parser('BIBFS',
+                                                 parents=[template_parser],
+                                                 help='Run bidirectional BFS')
+        # Bidirectional A* command
+        bia_parser = method_parsers.add_parser('BIASTAR',
+                                               parents=[template_parser],
+                                               help='Run bidirectional A* algorithm')
+        bia_parser.add_argument('-h1',
+                                dest='h1',
+                                action="store_const",
+                                const=True,
+                                default=False,
+                                help="Enable Manhattan Heuristic Function")
+        bia_parser.add_argument('-h2',
+                                dest='h2',
+                                action="store_const",
+                                const=True,
+                                default=False,
+                                help="Enable Permutation Heuristic Function")
         # DFS
         dfs_parser = method_parsers.add_parser('DFS',
                                              parents=[template_parser],
@@ -91,4 +329,238 @@ class Cli:
                                      action="store",
                                      help="depth limit for iterative deepening",
                                      required=False)
+        dfs_parser.add_argument('-pathonly',
+                                dest='path_only',
+                                action="store_const",
+                                const=True,
+                                default=False,
+                                help="Only avoid the boards of the current path, the memory grows with the depth only "
+                                     "(always on with -limit)")
+        dfs_parser.add_argument('-table',
+                                dest='table',
+                                metavar="int",
+                                action="store",
+                                help="Skip the boards already reached no deeper, remembering at most `int` boards "
+                                     "(implies -pathonly)",
+                                required=False)
+        # Batch command
+        batch_parser = method_parsers.add_parser('BATCH',
+                                                 help='Solve many puzzles with a pool of worker processes')
+        batch_parser.add_argument('-input',
+                                  dest='input',
+                                  metavar="file",
+                                  action="store",
+                                  default='-',
+                                  help="File of puzzles, one `init goal` pair or JSON object per line (stdin by default)")
+        batch_parser.add_argument('-width',
+                                  dest='width',
+                                  metavar="int",
+                                  action="store",
+                                  help="Width of the puzzles",
+                                  required=True)
+        batch_parser.add_argument('-height',
+                                  dest='height',
+                                  metavar="int",
+                                  action="store",
+                                  help="Height of the puzzles",
+                                  required=True)
+        batch_parser.add_argument('-moves',
+                                  dest='move_set',
+                                  choices=['8', '4'],
+                                  default='8',
+                                  help="Move set: 8 (every neighbour of the blank, default) or 4 (no diagonal moves)")
+        batch_parser.add_argument('-algorithm',
+                                  dest='algorithm',
+                                  choices=['BFS', 'ASTAR', 'IDASTAR', 'BIBFS', 'BIASTAR', 'DFS', 'WASTAR',
+                                           'ARASTAR', 'GREEDY'],
+                                  default='ASTAR',
+                                  help="Search used for every puzzle (ASTAR by default)")
+        batch_parser.add_argument('-weight',
+                                  dest='weight',
+                                  metavar="float",
+                                  action="store",
+                                  default='2',
+                                  help="Weight of h(n) in WASTAR and in the first round of ARASTAR (2 by default)")
+        batch_parser.add_argument('-step',
+                                  dest='step',
+                                  metavar="float",
+                                  action="store",
+                                  default='0.5',
+                                  help="Decrease of the weight after each round of ARASTAR (0.5 by default)")
+        batch_parser.add_argument('-h1',
+                                  dest='h1',
+                                  action="store_const",
+                                  const=True,
+                                  default=False,
+                                  help="Enable Manhattan Heuristic Function")
+        batch_parser.add_argument('-h2',
+                                  dest='h2',
+                                  action="store_const",
+                                  const=True,
+                                  default=False,
+                                  help="Enable Permutation Heuristic Function")
+        batch_parser.add_argument('-pdb',
+                                  dest='pdb',
+                                  metavar="file",
+                                  action="store",
+                                  default=None,
+                                  help="Enable Pattern Database Heuristic Function stored in the file (see PDB)")
+        batch_parser.add_argument('-workers',
+                                  dest='workers',
+                                  metavar="int",
+                                  action="store",
+                                  help="Number of worker processes (number of CPUs by default)",
+                                  required=False)
+        batch_parser.add_argument('-timeout',
+                                  dest='timeout',
+                                  metavar="seconds",
+                                  action="store",
+                                  help="Maximum time of the search of each puzzle",
+                                  required=False)
+        batch_parser.add_argument('-iteration',
+                                  dest='iteration',
+                                  metavar="int",
+                                  action="store",
+                                  help="Maximum iteration of the search of each puzzle",
+                                  required=False)
+        batch_parser.add_argument('-cache',
+                                  dest='cache',
+                                  metavar="file",
+                                  action="store",
+                                  help="Look up and store optimal solutions in the SQLite cache file",
+                                  required=False)
+        batch_parser.add_argument('-cachesize',
+                                  dest='cache_size',
+                                  metavar="int",
+                                  action="store",
+                                  help="Maximum number of boards kept in the cache (100000 by default)",
+                                  required=False)
+        batch_parser.add_argument('-canonical',
+                                  dest='canonical',
+                                  action="store_const",
+                                  const=True,
+                                  default=False,
+                                  help="Solve the canonical form of every puzzle, so symmetric puzzles share the cache")
+        batch_parser.add_argument('-sink',
+                                  dest='sink',
+                                  choices=['jsonl', 'moves', 'null'],
+                                  default='jsonl',
+                                  help="Solution path of each result: every board (default), move names only or none")
+        batch_parser.add_argument('-output',
+                                  dest='output',
+                                  metavar="file",
+                                  action="store",
+                                  default='-',
+                                  help="File to write the results to (stdout by default)")
+        # Solver service command
+        serve_parser = method_parsers.add_parser('SERVE',
+                                                 help='Answer JSON-RPC solve requests, one per line, keeping the '
+                                                      'tables, pattern databases and cache loaded')
+        serve_parser.add_argument('-socket',
+                                  dest='socket',
+                                  metavar="path",
+                                  action="store",
+                                  help="Listen on the Unix socket at `path` instead of stdin/stdout",
+                                  required=False)
+        serve_parser.add_argument('-cache',
+                                  dest='cache',
+                                  metavar="file",
+                                  action="store",
+                                  help="Look up and store optimal solutions in the SQLite cache file",
+                                  required=False)
+        serve_parser.add_argument('-cachesize',
+                                  dest='cache_size',
+                                  metavar="int",
+                                  action="store",
+                                  help="Maximum number of boards kept in the cache (100000 by default)",
+                                  required=False)
+        # Distance distribution command
+        layers_parser = method_parsers.add_parser('LAYERS',
+                                                  help='Count the boards at each distance from the goal state')
+        layers_parser.add_argument('-goal',
+                                   dest='goal_state',
+                                   metavar="3, 2, 1, 0 ...",
+                                   action="store",
+                                   help="Goal State",
+                                   required=True)
+        layers_parser.add_argument('-width',
+                                   dest='width',
+                                   metavar="int",
+                                   action="store",
+                                   help="Width of the puzzle",
+                                   required=True)
+        layers_parser.add_argument('-height',
+                                   dest='height',
+                                   metavar="int",
+                                   action="store",
+                                   help="Height of the puzzle",
+                                   required=True)
+        layers_parser.add_argument('-moves',
+                                   dest='move_set',
+                                   choices=['8', '4'],
+                                   default='8',
+                                   help="Move set: 8 (every neighbour of the blank, default) or 4 (no diagonal moves)")
+        layers_parser.add_argument('-backend',
+                                   dest='backend',
+                                   choices=['python', 'numpy'],
+                                   default='python',
+                                   help="numpy expands the layers in batches with NumPy (NumPy must be installed)")
+        layers_parser.add_argument('-memory',
+                                   dest='memory',
+                                   metavar="int",
+                                   action="store",
+                                   help="Maximum number of boards generated in memory, above it the layers spill "
+                                        "to disk",
+                                   required=False)
+        layers_parser.add_argument('-directory',
+                                   dest='directory',
+                                   metavar="dir",
+                                   action="store",
+                                   help="Directory of the spilled layers (the system temporary directory by default)",
+                                   required=False)
+        # Pattern database builder
+        pdb_parser = method_parsers.add_parser('PDB',
+                                             help='Build a pattern database for the -pdb heuristic')
+        pdb_parser.add_argument('-goal',
+                                dest='goal_state',
+                                metavar="3, 2, 1, 0 ...",
+                                action="store",
+                                help="Goal State",
+                                required=True)
+        pdb_parser.add_argument('-width',
+                                dest='width',
+                                metavar="int",
+                                action="store",
+                                help="Width of the puzzle",
+                                required=True)
+        pdb_parser.add_argument('-height',
+                                dest='height',
+                                metavar="int",
+                                action="store",
+                                help="Height of the puzzle",
+                                required=True)
+        pdb_parser.add_argument('-partition',
+                                dest='partition',
+                                metavar="1,2,3;4,5,6 ...",
+                                action="store",
+                                help="Disjoint groups of tiles separated by ';' (groups of 5 by default)",
+                                required=False)
+        pdb_parser.add_argument('-moves',
+                                dest='move_set',
+                                choices=['8', '4'],
+                                default='8',
+                                help="Move set: 8 (every neighbour of the blank, default) or 4 (no diagonal moves)")
+        pdb_parser.add_argument('-canonical',
+                                dest='canonical',
+                                action="store_const",
+                                const=True,
+                                default=False,
+                                help="Build the database for the canonical goal, shared by every goal with the "
+                                     "blank on a symmetric cell (for -canonical searches)")
+        pdb_parser.add_argument('-output',
+                                dest='output',
+                                metavar="file",
+                                action="store",
+                                help="File to write the pattern database to",
+                                required=True)
         return command_parser
@@ -0,0 +1,248 @@
+# -*- coding:utf8 -*-
+"""
+frontier.py contains the layer-by-layer breadth-first search that only keeps frontiers of packed boards
+"""
+from moves import MoveTable
+import heapq
+import mmap
+import os
+import shutil
+import tempfile
+
+
+class Layer:
+
+    # a sorted set of packed boards of `cells` bytes each, stored back to back in `buffer`
+    # the buffer is `bytes` in memory or a memory-mapped file on disk (`file` is kept open while it is used)
+    def __init__(self, buffer, cells, file=None):
+        self.__buffer = buffer
+        self.__cells = cells
+        self.__file = file
+
+    # create a layer from sorted boards, duplicates are dropped
+    # the layer is written to the file `path`, or kept in memory when `path` is None
+    @staticmethod
+    def create(boards, cells, path=None):
+        if path is None:
+            return Layer(b''.join(Layer.unique(boards)), cells)
+        with open(path, 'wb', buffering=1 << 20) as file:
+            for board in Layer.unique(boards):
+                file.write(board)
+        return Layer.open(path, cells)
+
+    # open a layer file
+    @staticmethod
+    def open(path, cells):
+        file = open(path, 'rb')
+        # an empty file can't be memory-mapped
+        if os.fstat(file.fileno()).st_size == 0:
+            return Layer(b'', cells, file)
+        return Layer(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ), cells, file)
+
+    # drop the repeated boards of a sorted stream
+    @staticmethod
+    def unique(boards):
+        last = None
+        for board in boards:
+            if board != last:
+                yield board
+                last = board
+
+    # the boards of a sorted stream that are not in the layer, by walking both in order
+    def difference(self, boards):
+        others = iter(self)
+        other = next(others, None)
+        for board in boards:
+            while other is not None and other < board:
+                other = next(others, None)
+            if board != other:
+                yield board
+
+    # the boards stored back to back
+    def get_buffer(self):
+        return self.__buffer
+
+    def __len__(self):
+        return len(self.__buffer) // self.__cells
+
+    def __iter__(self):
+        buffer = self.__buffer
+        cells = self.__cells
+        for idx in range(0, len(buffer), cells):
+            yield buffer[idx:idx+cells]
+
+    # binary search of a board
+    def __contains__(self, board):
+        buffer = self.__buffer
+        cells = self.__cells
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            other = buffer[middle * cells:(middle + 1) * cells]
+            if other == board:
+                return True
+            if other < board:
+                low = middle + 1
+            else:
+                high = middle
+        return False
+
+    def close(self):
+        if isinstance(self.__buffer, mmap.mmap):
+            self.__buffer.close()
+        if self.__file is not None:
+            self.__file.close()
+
+    # close the layer and delete its file
+    def remove(self):
+        self.close()
+        if self.__file is not None:
+            os.remove(self.__file.name)
+
+
+class FrontierSearch:
+
+    # `moves` is the MoveTable of the puzzle
+    # `memory` is the maximum number of boards generated in memory at a time. Without it every frontier is a set of
+    # packed boards in memory. With it every layer is a sorted file in a temporary directory under `directory`,
+    # the children are generated into sorted runs of at most `memory` boards, then merged into the next layer
+    # `backend` is a VectorBackend expanding the layers in memory by batches of CHUNK boards (see vectorized.py)
+    def __init__(self, moves, memory=None, directory=None, backend=None):
+        self.__moves = moves
+        self.__memory = memory
+        self.__directory = directory
+        self.__backend = None if memory is not None else backend
+
+    # boards expanded at a time by the vectorized backend
+    CHUNK = 4096
+
+    # breadth-first search from the packed board `root`, one whole layer at a time
+    # the moves are reversible, so the next layer is every child of the current layer that is neither in it nor
+    # in the previous layer, and only those three layers are needed to generate it
+    # - with a `target` the search stops at the layer holding it, the older layers are packed into sorted
+    #   buffers (or kept as files) and the path is recovered by backtracking from the target through them
+    # - without a `target` the search runs until every reachable board is seen
+    # `metrics` counts the expanded boards, `within_budget` is called before each expansion and stops the search
+    # when it returns False
+    # returns the number of boards of each layer and the path from `root` to `target` (empty if not found)
+    def run(self, root, target=None, metrics=None, within_budget=None):
+        directory = None if self.__memory is None else tempfile.mkdtemp(prefix='frontier-', dir=self.__directory)
+        cells = len(root)
+        layers = []
+        try:
+            layers.append(self.__create_layer__([root], cells, directory, 0))
+            sizes = [1]
+            while target is None or target not in layers[-1]:
+                # previous and current layers
+                previous = layers[-2] if len(layers) > 1 else set()
+                current = layers[-1]
+                if self.__backend is None:
+                    layer = self.__expand__(previous, current, cells, directory, len(layers), metrics, within_budget)
+                else:
+                    layer = self.__expand_batches__(previous, current, cells, metrics, within_budget)
+                if layer is None or len(layer) == 0:
+                    return sizes, []
+                layers.append(layer)
+                sizes.append(len(layer))
+                # the layer before the previous one is only needed to recover the path
+                if len(layers) > 3:
+                    old = layers[-4]
+                    if target is None:
+                        if isinstance(old, Layer):
+                            old.remove()
+                        layers[-4] = None
+                    elif isinstance(old, set):
+                        layers[-4] = Layer.create(sorted(old), cells)
+            if target is None:
+                return sizes, []
+            return sizes, self.__backtrack__(layers, target)
+        finally:
+            if directory is not None:
+                for layer in layers:
+                    if isinstance(layer, Layer):
+                        layer.close()
+                shutil.rmtree(directory, ignore_errors=True)
+
+    # generate the layer after `current`, returns None when the budget runs out
+    def __expand__(self, previous, current, cells, directory, depth, metrics, within_budget):
+        swaps = MoveTable.SWAPS
+        moves = self.__moves
+        children = set()
+        runs = []
+        generations = 0
+        for board in current:
+            if within_budget is not None and not within_budget():
+                for run in runs:
+                    run.remove()
+                return None
+            targets = moves.get_targets(board.index(0))
+            for target in targets:
+                children.add(board.translate(swaps[board[target]]))
+            generations += len(targets)
+            if metrics is not None:
+                metrics.expand(len(current) + len(children), len(previous) + len(current))
+            # spill the children to a sorted run
+            if self.__memory is not None and len(children) >= self.__memory:
+                runs.append(self.__create_layer__(sorted(children), cells, directory, str(depth) + '-' + str(len(runs))))
+                children = set()
+        if directory is None:
+            layer = children - current - previous
+        else:
+            # merge the runs and drop the boards of the current and previous layers
+            boards = heapq.merge(sorted(children), *runs)
+            if isinstance(previous, Layer):
+                boards = previous.difference(boards)
+            layer = self.__create_layer__(current.difference(Layer.unique(boards)), cells, directory, depth)
+            for run in runs:
+                run.remove()
+        if metrics is not None:
+            metrics.generations += generations
+            metrics.duplicates += generations - len(layer)
+        return layer
+
+    # generate the layer after `current` with the vectorized backend, returns None when the budget runs out
+    # the layers are sorted buffers, so the children are deduplicated and subtracted by sorting
+    def __expand_batches__(self, previous, current, cells, metrics, within_budget):
+        backend = self.__backend
+        boards = backend.to_array(current.get_buffer())
+        batches = []
+        for start in range(0, len(boards), FrontierSearch.CHUNK):
+            if within_budget is not None and not within_budget():
+                return None
+            batches.append(backend.expand(boards[start:start + FrontierSearch.CHUNK])[0])
+            if metrics is not None:
+                metrics.expand(len(current) + sum(len(batch) for batch in batches), len(previous) + len(current),
+                               len(boards[start:start + FrontierSearch.CHUNK]))
+        if not batches:
+            return Layer(b'', cells)
+        children = backend.to_array(b''.join(batch.tobytes() for batch in batches))
+        others = [boards] if not len(previous) else [boards, backend.to_array(previous.get_buffer())]
+        layer = Layer(backend.difference(children, others).tobytes(), cells)
+        if metrics is not None:
+            metrics.generations += len(children)
+            metrics.duplicates += len(children) - len(layer)
+        return layer
+
+    # a layer is a set in memory, a sorted buffer with the vectorized backend, or a sorted file `layer-{name}`
+    # in `directory`
+    def __create_layer__(self, boards, cells, directory, name):
+        if self.__backend is not None:
+            return Layer(b''.join(boards), cells)
+        if directory is None:
+            return set(boards)
+        return Layer.create(boards, cells, os.path.join(directory, 'layer-' + str(name)))
+
+    # recover the path to `target` found in the last layer: one of its neighbours is in the layer before, and so on
+    def __backtrack__(self, layers, target):
+        swaps = MoveTable.SWAPS
+        path = [target]
+        board = target
+        for layer in reversed(layers[:-1]):
+            for neighbour in self.__moves.get_targets(board.index(0)):
+                child = board.translate(swaps[board[neighbour]])
+                if child in layer:
+                    board = child
+                    break
+            path.append(board)
+        path.reverse()
+        return path
@@ -0,0 +1,76 @@
+# -*- coding:utf8 -*-
+"""
+heuristic.py contains the heuristic functions used by the searches
+"""
+from abc import ABC, abstractmethod
+
+
+class Heuristic(ABC):
+
+    # `goal_position` is the goal-position table of the Solver: goal_position[tile] is the index of the tile
+    # on the flat goal board, built once per Solver and shared by every heuristic
+    def __init__(self, goal_position, width):
+        self._goal_position = goal_position
+        self._width = width
+
+    # create the heuristic function by its command line name
+    @staticmethod
+    def create(heuristic_type, goal_position, width):
+        if heuristic_type == 'h1':
+            return Hamming(goal_position, width)
+        if heuristic_type == 'h2':
+            return Permutation(goal_position, width)
+        raise ValueError('Unknown heuristic function: ' + str(heuristic_type))
+
+    # calculate the heuristic value of a flat board from scratch
+    @abstractmethod
+    def evaluate(self, state):
+        pass
+
+    # derive the heuristic value of a child from its parent's value `h`
+    # the child is `state` with the tile at `target` slid into the blank at `blank`
+    @abstractmethod
+    def update(self, state, blank, target, h):
+        pass
+
+
+class Hamming(Heuristic):
+
+    # the number of misplaced tiles, the blank 0 excluded
+    def evaluate(self, state):
+        goal_position = self._goal_position
+        return sum(1 for idx, tile in enumerate(state) if tile != 0 and goal_position[tile] != idx)
+
+    # only the moved tile changes, so the delta is whether it was misplaced before and after the move
+    def update(self, state, blank, target, h):
+        goal = self._goal_position[state[target]]
+        return h + (goal != blank) - (goal != target)
+
+
+class Permutation(Heuristic):
+
+    # the sum of permutation: for each tile, the number of tiles on its right that should be on its left
+    def evaluate(self, state):
+        goal_position = self._goal_position
+        tiles = [goal_position[tile] for tile in state if tile != 0]
+        h = 0
+        for idx, goal in enumerate(tiles):
+            for other in tiles[idx+1:]:
+                if other < goal:
+                    h += 1
+        return h
+
+    # the moved tile jumps over the tiles lying between `target` and `blank` on the flat board,
+    # so only its order against those tiles flips, which costs at most width + 1 lookups
+    def update(self, state, blank, target, h):
+        goal_position = self._goal_position
+        goal = goal_position[state[target]]
+        if target > blank:
+            # the tile moves left, in front of the tiles it jumps over
+            for tile in state[blank+1:target]:
+                h += 1 if goal > goal_position[tile] else -1
+        else:
+            # the tile moves right, behind the tiles it jumps over
+            for tile in state[target+1:blank]:
+                h += 1 if goal_position[tile] > goal else -1
+        return h
@@ -0,0 +1,100 @@
+# -*- coding:utf8 -*-
+"""
+metrics.py is the model of the statistics of a search
+"""
+import json
+import sys
+import time
+
+
+class SearchMetrics:
+
+    # the counters are plain attributes, the searches update them in their loops
+    # every time is in seconds, measured with time.perf_counter()
+    # `progress` prints a progress line to `stream` (stderr by default) every `progress` expanded nodes
+    def __init__(self, algorithm, progress=None, stream=None):
+        self.algorithm = algorithm
+        # expanded nodes, generated children and children dropped as already seen
+        self.expansions = 0
+        self.generations = 0
+        self.duplicates = 0
+        # largest open list (frontier, or path for IDA*) and closed list (visited boards) of the search
+        self.peak_open = 0
+        self.peak_closed = 0
+        # time spent in successor generation, heuristic evaluation and open list operations, only measured when
+        # the Solver profiles the search
+        self.successor_time = 0.0
+        self.heuristic_time = 0.0
+        self.queue_time = 0.0
+        self.total_time = 0.0
+        self.solved = False
+        self.solution_length = None
+        # the solution was found in the SolutionCache without searching
+        self.cached = False
+        # the path is proven to cost at most this factor times the shortest one (anytime searches and bidirectional
+        # A*, where a path found when the budget runs out is above 1 unless proven shortest)
+        self.suboptimality = None
+        self.__progress = progress
+        self.__stream = sys.stderr if stream is None else stream
+        self.__start = time.perf_counter()
+
+    # count one expanded node (or a batch of `count` nodes) and track the sizes of the open and closed lists
+    def expand(self, open_size, closed_size, count=1):
+        self.expansions += count
+        if open_size > self.peak_open:
+            self.peak_open = open_size
+        if closed_size > self.peak_closed:
+            self.peak_closed = closed_size
+        if self.__progress and self.expansions // self.__progress != (self.expansions - count) // self.__progress:
+            self.total_time = time.perf_counter() - self.__start
+            self.__stream.write(self.to_progress_line() + '\n')
+            self.__stream.flush()
+
+    # stop the clock, `path` is the solution path (list of states) or empty
+    def stop(self, path):
+        self.total_time = time.perf_counter() - self.__start
+        self.solved = len(path) > 0
+        self.solution_length = len(path) - 1 if self.solved else None
+
+    # add up the counters of another search, i.e. a round of IDDFS
+    def merge(self, other):
+        self.expansions += other.expansions
+        self.generations += other.generations
+        self.duplicates += other.duplicates
+        self.peak_open = max(self.peak_open, other.peak_open)
+        self.peak_closed = max(self.peak_closed, other.peak_closed)
+        self.successor_time += other.successor_time
+        self.heuristic_time += other.heuristic_time
+        self.queue_time += other.queue_time
+        self.cached = self.cached or other.cached
+
+    def get_nodes_per_second(self):
+        return self.expansions / self.total_time if self.total_time > 0 else 0.0
+
+    def to_dict(self):
+        return {
+            'algorithm': self.algorithm,
+            'solved': self.solved,
+            'solution_length': self.solution_length,
+            'cached': self.cached,
+            'suboptimality': self.suboptimality,
+            'expansions': self.expansions,
+            'generations': self.generations,
+            'duplicates': self.duplicates,
+            'peak_open': self.peak_open,
+            'peak_closed': self.peak_closed,
+            'successor_time': self.successor_time,
+            'heuristic_time': self.heuristic_time,
+            'queue_time': self.queue_time,
+            'total_time': self.total_time,
+            'nodes_per_second': self.get_nodes_per_second()
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def to_progress_line(self):
+        return '[' + self.algorithm + '] ' + str(self.expansions) + ' expanded, ' + \
+               str(self.generations) + ' generated, ' + str(self.duplicates) + ' duplicates, peak open ' + \
+               str(self.peak_open) + ', peak closed ' + str(self.peak_closed) + ', ' + \
+               str(int(self.get_nodes_per_second())) + ' nodes/s'
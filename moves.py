@@ -0,0 +1,83 @@
+# -*- coding:utf8 -*-
+"""
+moves.py contains the precomputed move tables of the puzzle geometries
+"""
+
+
+class MoveTable:
+
+    # the blank's neighbours (row, column offsets), from the most preferred move to the least preferred one
+    # UP > UP –RIGHT > RIGHT > DOWN- RIGHT > DOWN > DOWN –LEFT > LEFT > UP–LEFT
+    # the inverse of move i is move (i + 4) % 8
+    MOVES = [[1, 0], [1, -1], [0, -1], [-1, -1], [-1, 0], [-1, 1], [0, 1], [1, 1]]
+    # the names of the moves, the direction the tile slides into the blank
+    NAMES = ['U', 'UR', 'R', 'DR', 'D', 'DL', 'L', 'UL']
+    # the moves of each move set: `8` is every neighbour, `4` is orthogonal neighbours only
+    MOVE_SETS = {
+        '8': [0, 1, 2, 3, 4, 5, 6, 7],
+        '4': [0, 2, 4, 6]
+    }
+    # SWAPS[tile] is a bytes.translate() table swapping the tile with the blank 0. Tiles are unique on a board,
+    # so translating a packed board moves the tile into the blank in one call and one allocation
+    SWAPS = []
+    for tile in range(256):
+        table = bytearray(range(256))
+        table[0], table[tile] = tile, 0
+        SWAPS.append(bytes(table))
+    del tile, table
+
+    # tables are cached per (width, height, move set) across solver instances
+    __tables = {}
+
+    # get the move table of a geometry, built on first use
+    @staticmethod
+    def get(width, height, move_set='8'):
+        key = (width, height, move_set)
+        if key not in MoveTable.__tables:
+            MoveTable.__tables[key] = MoveTable(width, height, move_set)
+        return MoveTable.__tables[key]
+
+    def __init__(self, width, height, move_set='8'):
+        if move_set not in MoveTable.MOVE_SETS:
+            raise ValueError('Unknown move set: ' + str(move_set))
+        self.__width = width
+        self.__height = height
+        self.__move_set = move_set
+        # neighbours[blank] is the tuple of (move, neighbour index) pairs of a blank position on the flat board
+        self.__neighbours = []
+        for cell in range(width * height):
+            row, column = divmod(cell, width)
+            self.__neighbours.append(tuple(
+                (move, (row + MoveTable.MOVES[move][0]) * width + column + MoveTable.MOVES[move][1])
+                for move in MoveTable.MOVE_SETS[move_set]
+                if 0 <= row + MoveTable.MOVES[move][0] < height and 0 <= column + MoveTable.MOVES[move][1] < width))
+        # targets[blank] is the tuple of neighbour indexes only
+        self.__targets = [tuple(target for _, target in neighbours) for neighbours in self.__neighbours]
+
+    def get_move_set(self):
+        return self.__move_set
+
+    def get_neighbours(self, blank):
+        return self.__neighbours[blank]
+
+    def get_targets(self, blank):
+        return self.__targets[blank]
+
+    # check if the move set has diagonal moves
+    def has_diagonals(self):
+        return any(MoveTable.MOVES[move][0] and MoveTable.MOVES[move][1] for move in MoveTable.MOVE_SETS[self.__move_set])
+
+    # the move undoing `move`
+    @staticmethod
+    def inverse(move):
+        return (move + 4) % 8
+
+    # the names of the moves along a path of packed boards, i.e. ['U', 'UR', 'L']
+    @staticmethod
+    def directions(path, width):
+        names = []
+        for state, child in zip(path, path[1:]):
+            blank_row, blank_column = divmod(state.index(0), width)
+            target_row, target_column = divmod(child.index(0), width)
+            names.append(MoveTable.NAMES[MoveTable.MOVES.index([target_row - blank_row, target_column - blank_column])])
+        return names
@@ -0,0 +1,277 @@
+# -*- coding:utf8 -*-
+"""
+parallel.py contains the hash-distributed parallel A* search (HDA*)
+"""
+from heuristic import Heuristic
+from pattern_database import PatternDatabase
+from moves import MoveTable
+import heapq
+import multiprocessing
+import queue
+import time
+import zlib
+
+
+class ParallelAstar:
+
+    # a worker sends its generated nodes to their owners in batches of this size
+    BATCH = 128
+    # seconds between two checks of the coordinator
+    POLL = 0.005
+    # cost of the incumbent solution before one is found
+    INFINITY = 1 << 30
+    # seconds to wait for a message of the workers before checking that they are still running
+    TIMEOUT = 1.0
+    # a worker publishes its expanded nodes (and flushes its batches) at most every PUBLISH expansions
+    PUBLISH = 1024
+
+    # `workers` is the number of worker processes, the boards are distributed among them by a hash
+    # `heuristic_type` takes either `h1`, `h2` or `pdb`, `pattern_database` is the path of the pattern database file
+    # `iteration` is the budget of expanded nodes of all the workers, each one publishes its count every
+    # iteration / workers expansions when that is below PUBLISH
+    def __init__(self, workers, width, height, move_set, goal_position, heuristic_type, pattern_database=None,
+                 iteration=None):
+        self.__workers = workers
+        self.__publish = ParallelAstar.PUBLISH if iteration is None else \
+            max(1, min(ParallelAstar.PUBLISH, iteration // workers))
+        self.__width = width
+        self.__height = height
+        self.__move_set = move_set
+        self.__goal_position = goal_position
+        self.__heuristic_type = heuristic_type
+        self.__pattern_database = pattern_database
+
+    # the worker owning a packed board
+    @staticmethod
+    def owner(state, workers):
+        return zlib.crc32(state) % workers
+
+    # search a shortest path from `init_state` to `goal_state` (packed boards)
+    # every worker runs A* on the boards it owns and sends the children owned by other workers to them.
+    # A found goal is only an incumbent, the search ends when every worker is idle (its open list is empty or its
+    # lowest f(n) is no better than the incumbent) and every sent node has been received, so the incumbent is optimal
+    # `within_budget(expansions)` is called by the coordinator with the expanded nodes of all workers and stops
+    # the search when it returns False. The workers publish their count every few expansions and the coordinator
+    # checks it every POLL seconds, so the search expands up to workers * min(PUBLISH, iteration / workers) nodes
+    # more, plus the ones of a POLL
+    # `metrics` counts the published expansions during the search (for its progress line), and gets the counters
+    # of every worker at the end
+    # returns the path (list of packed boards) or an empty list
+    # raises RuntimeError when a worker fails
+    def run(self, init_state, goal_state, within_budget, metrics):
+        workers = self.__workers
+        context = multiprocessing.get_context()
+        inboxes = [context.Queue() for _ in range(workers)]
+        results = context.Queue()
+        stop = context.Event()
+        # per worker: idle flag, sent nodes and received nodes, all updated together under `lock`
+        # the last slot of the counters is the coordinator, which sends the initial state
+        lock = context.Lock()
+        # cost of the best solution found so far, shared by all workers and only lowered under `lock`
+        incumbent = context.Value('i', ParallelAstar.INFINITY, lock=False)
+        idle = context.Array('i', [1] * workers, lock=False)
+        sent = context.Array('q', [0] * (workers + 1), lock=False)
+        received = context.Array('q', [0] * workers, lock=False)
+        expansions = context.Array('q', [0] * workers, lock=False)
+        processes = [context.Process(target=ParallelAstar.work,
+                                     args=(number, workers, inboxes, results, stop, incumbent, lock, idle, sent,
+                                           received, expansions, self.__publish, self.__width, self.__height,
+                                           self.__move_set, self.__goal_position, self.__heuristic_type,
+                                           self.__pattern_database, goal_state))
+                     for number in range(workers)]
+        for process in processes:
+            process.start()
+        path = []
+        failure = None
+        try:
+            with lock:
+                sent[workers] += 1
+            inboxes[ParallelAstar.owner(init_state, workers)].put(('nodes', [(0, None, init_state, None, None)]))
+            # wait for the termination or the end of the budget
+            solved = False
+            while within_budget(sum(expansions)):
+                time.sleep(ParallelAstar.POLL)
+                published = sum(expansions)
+                if published > metrics.expansions:
+                    metrics.expand(0, 0, published - metrics.expansions)
+                # a worker only exits before the end of the search when it fails
+                if any(process.exitcode is not None for process in processes):
+                    failure = 'A worker of the parallel search exited unexpectedly'
+                    break
+                with lock:
+                    if all(idle) and sum(sent) == sum(received):
+                        solved = incumbent.value < ParallelAstar.INFINITY
+                        break
+            stop.set()
+            # rebuild the path by asking the owner of each board for its parent
+            if solved:
+                state = goal_state
+                while state is not None:
+                    path.append(state)
+                    inboxes[ParallelAstar.owner(state, workers)].put(('parent', state))
+                    state = ParallelAstar.receive(results, processes)
+                    if isinstance(state, tuple):
+                        raise RuntimeError(state[1])
+                path.reverse()
+        finally:
+            stop.set()
+            for inbox in inboxes:
+                inbox.put(('exit',))
+            # every worker answers the exit with its counters, or has sent its error instead
+            # the final counts replace the published ones
+            metrics.expansions = 0
+            try:
+                for _ in range(workers):
+                    counters = ParallelAstar.receive(results, processes)
+                    if counters[0] == 'error':
+                        failure = counters[1]
+                        continue
+                    metrics.expansions += counters[0]
+                    metrics.generations += counters[1]
+                    metrics.duplicates += counters[2]
+                    metrics.peak_open += counters[3]
+                    metrics.peak_closed += counters[4]
+            finally:
+                for process in processes:
+                    process.join(ParallelAstar.TIMEOUT)
+                    if process.is_alive():
+                        process.terminate()
+        if failure is not None:
+            raise RuntimeError(failure)
+        return path
+
+    # the next message of the workers on `results`
+    # raises RuntimeError when none comes and a worker has died or every worker has exited
+    @staticmethod
+    def receive(results, processes):
+        while True:
+            try:
+                return results.get(timeout=ParallelAstar.TIMEOUT)
+            except queue.Empty:
+                if all(process.exitcode is not None for process in processes) or \
+                        any(process.exitcode not in [None, 0] for process in processes):
+                    raise RuntimeError('A worker of the parallel search exited unexpectedly')
+
+    # the worker process, a failure is sent on `results` as ('error', message) instead of the counters
+    @staticmethod
+    def work(number, workers, inboxes, results, *args):
+        try:
+            ParallelAstar.__work__(number, workers, inboxes, results, *args)
+        except Exception as error:
+            results.put(('error', 'Worker ' + str(number) + ' failed: ' + repr(error)))
+
+    # the loop of a worker process
+    # a node is (g(n), h(n), packed board, parent board, blank index), h(n) and the blank are None when unknown
+    @staticmethod
+    def __work__(number, workers, inboxes, results, stop, incumbent, lock, idle, sent, received, expansions, publish,
+                 width, height, move_set, goal_position, heuristic_type, pattern_database, goal_state):
+        # nodes still queued for a worker that has exited are dropped instead of blocking this process's exit
+        for inbox in inboxes:
+            inbox.cancel_join_thread()
+        moves = MoveTable.get(width, height, move_set)
+        swaps = MoveTable.SWAPS
+        if heuristic_type == 'pdb':
+            heuristic = PatternDatabase.load(pattern_database, goal_position, width, move_set)
+        else:
+            heuristic = Heuristic.create(heuristic_type, goal_position, width)
+        owner = ParallelAstar.owner
+        # open list (binary heap) of (f(n), h(n), order, board) and best (g(n), parent, h(n), blank) per board
+        open_list = []
+        best = {}
+        order = 0
+        outboxes = [[] for _ in range(workers)]
+        expanded = generations = duplicates = peak_open = 0
+
+        # add a node owned by this worker unless a path as cheap is known
+        def insert(g, h, state, parent, blank):
+            nonlocal order, duplicates
+            known = best.get(state)
+            if known is not None and known[0] <= g:
+                duplicates += 1
+                return
+            if h is None:
+                h = heuristic.evaluate(state)
+                blank = state.index(0)
+            best[state] = (g, parent, h, blank)
+            if g + h < incumbent.value:
+                order += 1
+                heapq.heappush(open_list, (g + h, h, order, state))
+
+        # send the buffered nodes to their owners
+        def flush():
+            for other, nodes in enumerate(outboxes):
+                if nodes:
+                    with lock:
+                        sent[number] += len(nodes)
+                    inboxes[other].put(('nodes', nodes))
+                    outboxes[other] = []
+
+        # handle a message, returns False on exit
+        def receive(message):
+            if message[0] == 'nodes':
+                with lock:
+                    idle[number] = 0
+                    received[number] += len(message[1])
+                for g, h, state, parent, blank in message[1]:
+                    insert(g, h, state, parent, blank)
+            elif message[0] == 'parent':
+                results.put(best[message[1]][1])
+            else:
+                return False
+            return True
+
+        while True:
+            # take the nodes sent by the other workers
+            try:
+                while True:
+                    if not receive(inboxes[number].get_nowait()):
+                        results.put((expanded, generations, duplicates, peak_open, len(best)))
+                        return
+            except queue.Empty:
+                pass
+            if stop.is_set() or not open_list or open_list[0][0] >= incumbent.value:
+                # nothing to expand below the incumbent
+                if not stop.is_set():
+                    flush()
+                    with lock:
+                        if not open_list or open_list[0][0] >= incumbent.value:
+                            idle[number] = 1
+                try:
+                    if not receive(inboxes[number].get(timeout=ParallelAstar.POLL)):
+                        results.put((expanded, generations, duplicates, peak_open, len(best)))
+                        return
+                except queue.Empty:
+                    pass
+                continue
+            f, h, _, state = heapq.heappop(open_list)
+            g, _, _, blank = best[state]
+            # skip stale entries that were superseded by a cheaper path
+            if g + h != f:
+                continue
+            expanded += 1
+            peak_open = max(peak_open, len(open_list))
+            if expanded % publish == 0:
+                expansions[number] = expanded
+                flush()
+            if state == goal_state:
+                with lock:
+                    if g < incumbent.value:
+                        incumbent.value = g
+                continue
+            targets = moves.get_targets(blank)
+            generations += len(targets)
+            for target in targets:
+                child = state.translate(swaps[state[target]])
+                child_h = heuristic.update(state, blank, target, h)
+                if g + 1 + child_h >= incumbent.value:
+                    continue
+                other = owner(child, workers)
+                if other == number:
+                    insert(g + 1, child_h, child, state, target)
+                else:
+                    outboxes[other].append((g + 1, child_h, child, state, target))
+                    if len(outboxes[other]) >= ParallelAstar.BATCH:
+                        with lock:
+                            sent[number] += len(outboxes[other])
+                        inboxes[other].put(('nodes', outboxes[other]))
+                        outboxes[other] = []
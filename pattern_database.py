@@ -0,0 +1,165 @@
+# -*- coding:utf8 -*-
+"""
+pattern_database.py contains the disjoint additive pattern database heuristic
+"""
+from heuristic import Heuristic
+from moves import MoveTable
+from collections import deque
+import mmap
+import struct
+
+
+class PatternDatabase(Heuristic):
+
+    # file layout: header (with the move set), goal board, then for every group its size and tiles,
+    # followed by the tables
+    # each table has one byte per placement of the group's tiles (cells ** group size entries)
+    MAGIC = b'PDB1'
+    HEADER = struct.Struct('<4sHHBB')
+    # the largest group that can be built, the BFS keeps one byte per (placement, blank) pair
+    MAX_GROUP = 6
+
+    def __init__(self, goal_position, width, goal_state, groups, tables, buffer=None, move_set='8'):
+        super().__init__(goal_position, width)
+        self.__goal_state = goal_state
+        self.__move_set = move_set
+        self.__groups = groups
+        self.__tables = tables
+        # keep the mmap alive as long as the tables are used
+        self.__buffer = buffer
+        # weights[tile] is the multiplier of the tile's position in its group's table index
+        # membership[tile] is the number of the group the tile belongs to, or None
+        cells = len(goal_state)
+        self.__weights = [0] * cells
+        self.__membership = [None] * cells
+        for number, group in enumerate(groups):
+            for idx, tile in enumerate(group):
+                self.__weights[tile] = cells ** idx
+                self.__membership[tile] = number
+
+    def get_groups(self):
+        return self.__groups
+
+    # the table of each group, one byte per placement of the group's tiles
+    def get_tables(self):
+        return self.__tables
+
+    # sum of the groups' table values
+    def evaluate(self, state):
+        h = 0
+        for number in range(len(self.__groups)):
+            h += self.__tables[number][self.__table_index__(state, number)]
+        return h
+
+    # only the group of the moved tile changes, and its index moves by the tile's weight times the jump
+    def update(self, state, blank, target, h):
+        tile = state[target]
+        number = self.__membership[tile]
+        if number is None:
+            return h
+        table = self.__tables[number]
+        index = self.__table_index__(state, number)
+        return h - table[index] + table[index + (blank - target) * self.__weights[tile]]
+
+    # the table index of a group on a flat board
+    def __table_index__(self, state, number):
+        weights = self.__weights
+        return sum(state.index(tile) * weights[tile] for tile in self.__groups[number])
+
+    # build the tables for `goal_state` by a backward breadth-first search from the goal for each group
+    # `partition` is a list of disjoint tile groups, by default the tiles are split in groups of 5
+    # `move_set` is the move set of the solver (see MoveTable.MOVE_SETS)
+    @staticmethod
+    def build(goal_state, width, height, partition=None, move_set='8'):
+        goal_state = bytes(goal_state)
+        tiles = [tile for tile in range(1, len(goal_state))]
+        if partition is None:
+            partition = [tiles[idx:idx+5] for idx in range(0, len(tiles), 5)]
+        flat = [tile for group in partition for tile in group]
+        if len(flat) != len(set(flat)) or not set(flat) <= set(tiles):
+            raise ValueError('The partition must be disjoint groups of tiles 1 to ' + str(len(tiles)))
+        if max(len(group) for group in partition) > PatternDatabase.MAX_GROUP:
+            raise ValueError('A group can have at most ' + str(PatternDatabase.MAX_GROUP) + ' tiles')
+        moves = MoveTable.get(width, height, move_set)
+        tables = [PatternDatabase.__build_table__(list(group), goal_state, moves) for group in partition]
+        goal_position = [0] * len(goal_state)
+        for idx, tile in enumerate(goal_state):
+            goal_position[tile] = idx
+        return PatternDatabase(goal_position, width, goal_state, [list(group) for group in partition], tables,
+                               move_set=move_set)
+
+    # write the database to `path` in the compact binary layout
+    def save(self, path):
+        height = len(self.__goal_state) // self._width
+        with open(path, 'wb') as file:
+            file.write(PatternDatabase.HEADER.pack(PatternDatabase.MAGIC, self._width, height,
+                                                   int(self.__move_set), len(self.__groups)))
+            file.write(self.__goal_state)
+            for group in self.__groups:
+                file.write(bytes([len(group)] + group))
+            for table in self.__tables:
+                file.write(table)
+
+    # load the database at `path` with mmap, so solver processes share the same pages
+    # the database must have been built for the same goal, board and move set
+    @staticmethod
+    def load(path, goal_position, width, move_set='8'):
+        with open(path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, file_width, height, moves, count = PatternDatabase.HEADER.unpack_from(buffer, 0)
+        if magic != PatternDatabase.MAGIC:
+            raise ValueError(path + ' is not a pattern database')
+        offset = PatternDatabase.HEADER.size
+        cells = file_width * height
+        goal_state = bytes(buffer[offset:offset+cells])
+        offset += cells
+        if file_width != width or len(goal_position) != cells or \
+                any(goal_position[tile] != idx for idx, tile in enumerate(goal_state)):
+            raise ValueError(path + ' was built for a different goal state or puzzle size')
+        if str(moves) != move_set:
+            raise ValueError(path + ' was built for a different move set')
+        groups = []
+        for _ in range(count):
+            size = buffer[offset]
+            groups.append(list(buffer[offset+1:offset+1+size]))
+            offset += 1 + size
+        view = memoryview(buffer)
+        tables = []
+        for group in groups:
+            tables.append(view[offset:offset + cells ** len(group)])
+            offset += cells ** len(group)
+        return PatternDatabase(goal_position, width, goal_state, groups, tables, buffer, move_set)
+
+    # 0-1 breadth-first search over (placement of the group's tiles, blank) from the goal
+    # moving a group tile costs 1, moving any other tile costs 0, so the groups' values add up admissibly
+    # the table keeps the cheapest cost over all blank positions
+    @staticmethod
+    def __build_table__(group, goal_state, moves):
+        cells = len(goal_state)
+        weights = [cells ** idx for idx in range(len(group))]
+        positions = tuple(goal_state.index(tile) for tile in group)
+        index = sum(position * weight for position, weight in zip(positions, weights))
+        table = bytearray(b'\xff') * (cells ** len(group))
+        distance = bytearray(b'\xff') * (cells ** len(group) * cells)
+        blank = goal_state.index(0)
+        distance[index * cells + blank] = 0
+        queue = deque([(index, positions, blank, 0)])
+        while queue:
+            index, positions, blank, cost = queue.popleft()
+            if distance[index * cells + blank] < cost:
+                continue
+            if cost < table[index]:
+                table[index] = cost
+            for cell in moves.get_targets(blank):
+                if cell in positions:
+                    # a group tile slides into the blank
+                    idx = positions.index(cell)
+                    moved = index + (blank - cell) * weights[idx]
+                    if cost + 1 < distance[moved * cells + cell]:
+                        distance[moved * cells + cell] = cost + 1
+                        queue.append((moved, positions[:idx] + (blank,) + positions[idx+1:], cell, cost + 1))
+                elif cost < distance[index * cells + cell]:
+                    # any other tile slides into the blank for free
+                    distance[index * cells + cell] = cost
+                    queue.appendleft((index, positions, cell, cost))
+        return table
@@ -3,30 +3,52 @@
 puzzle.py is the driver of the project.
 """
 from cli import Cli
-from solver import Solver
+from api import solve, valid_states
+from pattern_database import PatternDatabase
+from batch import run_batch
+from server import SolverService
+from cache import SolutionCache
+from sink import ResultSink
+from frontier import FrontierSearch
+from vectorized import VectorBackend
+from moves import MoveTable
+from symmetry import Symmetry
+import asyncio
+import json
 import os
+import sys
 
 
 # validation method to check if the user input make sense
-def validate_state(init_state, goal_state, width, height):
-    print('Initial State: ' + str(init_state))
-    print('Goal State: ' + str(goal_state))
-    print('Puzzle Size: ' + str(width) + ' by ' + str(height))
-    print('Validating the puzzle configuration......')
+# the messages are printed to `log`
+def validate_state(init_state, goal_state, width, height, log=sys.stdout):
+    print('Initial State: ' + str(init_state), file=log)
+    print('Goal State: ' + str(goal_state), file=log)
+    print('Puzzle Size: ' + str(width) + ' by ' + str(height), file=log)
+    print('Validating the puzzle configuration......', file=log)
     # checking if both init_state and goal_state has identical numbers of tile and fit the defined width and height
     if len(init_state) == len(goal_state) == int(height) * int(width):
-        print('Matrix size validation is good.')
+        print('Matrix size validation is good.', file=log)
         # checking if both init_state and goal_state have the right numbers (i.e. for 4x3 puzzle should have 0~11)
-        number = 0
-        while number < int(height) * int(width):
-            if number in init_state and number in goal_state:
-                number += 1
-        if number == int(height) * int(width):
-            print('Tile number validation is good.')
+        if valid_states(init_state, goal_state, int(width), int(height)):
+            print('Tile number validation is good.', file=log)
             return True
     return False
 
 
+# check if h1, h2 or pdb are selected. Only one heuristic function can be selected.
+def select_heuristic(args):
+    selected = [name for name, enabled in [('h1', args.h1), ('h2', args.h2),
+                                           ('pdb', getattr(args, 'pdb', None) is not None)] if enabled]
+    if len(selected) > 1:
+        print('You can only select one of the heuristic functions.')
+        os._exit(1)
+    elif len(selected) == 0:
+        print('You must select one heuristic function.')
+        os._exit(1)
+    return selected[0]
+
+
 # convert the user input state from string to a list of int
 def convert_state_to_int(state):
     int_state = []
@@ -39,7 +61,75 @@ if __name__ == '__main__':
 
     # get user input from command line
     args = Cli.create_parser().parse_args()
-    print('\n\n-----------------------------------------------------------------------')
+    # solve a batch of puzzles, the results are streamed to stdout as JSON lines
+    if args.subparser_name == 'BATCH':
+        heuristic_type = None if args.algorithm in ['DFS', 'BIBFS'] else select_heuristic(args)
+        lines = sys.stdin if args.input == '-' else open(args.input)
+        output = sys.stdout if args.output == '-' else open(args.output, 'w', buffering=ResultSink.BUFFER)
+        run_batch(lines, output, int(args.width), int(args.height), args.algorithm,
+                  heuristic_type=heuristic_type,
+                  iteration=1000 if args.iteration is None else int(args.iteration),
+                  timeout=None if args.timeout is None else float(args.timeout),
+                  workers=None if args.workers is None else int(args.workers),
+                  pattern_database=args.pdb, move_set=args.move_set, cache=args.cache,
+                  cache_size=None if args.cache_size is None else int(args.cache_size), sink=args.sink,
+                  weight=float(args.weight), step=float(args.step), canonical=args.canonical)
+        lines.close()
+        if output is not sys.stdout:
+            output.close()
+        sys.stdout.flush()
+        os._exit(0)
+    # answer JSON-RPC requests until a shutdown, stdout is left to the responses
+    if args.subparser_name == 'SERVE':
+        service = SolverService(args.cache, None if args.cache_size is None else int(args.cache_size))
+        if args.socket is None:
+            asyncio.run(service.serve_stdio())
+        else:
+            asyncio.run(service.serve_unix(args.socket))
+        # os._exit doesn't wait for the thread still reading stdin after a shutdown, but skips the flush of stdout
+        sys.stdout.flush()
+        os._exit(0)
+    # the human readable log goes to stderr when the solutions of a search are written to stdout
+    sink = None
+    log = sys.stdout
+    if args.subparser_name not in ['PDB', 'LAYERS']:
+        sink = ResultSink.create(args.sink, args.output)
+        if sink.is_stdout():
+            log = sys.stderr
+    print('\n\n-----------------------------------------------------------------------', file=log)
+    # build a pattern database and exit
+    if args.subparser_name == 'PDB':
+        goal_state = convert_state_to_int(args.goal_state)
+        if args.canonical:
+            goal_state = list(Symmetry.canonical_goal(bytes(goal_state), int(args.width), int(args.height)))
+            print('Canonical goal state: ' + str(goal_state))
+        partition = None
+        if args.partition is not None:
+            partition = [convert_state_to_int(group) for group in args.partition.split(';')]
+        print('Building the pattern database......')
+        PatternDatabase.build(goal_state, int(args.width), int(args.height), partition,
+                              args.move_set).save(args.output)
+        print('Pattern database is saved in ' + args.output)
+        sys.stdout.flush()
+        os._exit(0)
+    # count the boards at each distance from the goal state by an exhaustive layered BFS, printed as JSON
+    if args.subparser_name == 'LAYERS':
+        goal_state = bytes(convert_state_to_int(args.goal_state))
+        moves = MoveTable.get(int(args.width), int(args.height), args.move_set)
+        backend = None
+        if args.backend == 'numpy':
+            goal_position = [0] * len(goal_state)
+            for idx, tile in enumerate(goal_state):
+                goal_position[tile] = idx
+            backend = VectorBackend(moves, goal_position)
+        print('Counting the boards at each distance from the goal state......')
+        search = FrontierSearch(moves, None if args.memory is None else int(args.memory), args.directory, backend)
+        layers = search.run(goal_state)[0]
+        print(json.dumps({'width': int(args.width), 'height': int(args.height), 'move_set': args.move_set,
+                          'layers': layers, 'total': sum(layers)}))
+        # os._exit skips the flush of stdout, the distribution would be lost when it is redirected
+        sys.stdout.flush()
+        os._exit(0)
     # init solver with validated input
     init_state = convert_state_to_int(args.init_state)
     goal_state = convert_state_to_int(args.goal_state)
@@ -48,33 +138,50 @@ if __name__ == '__main__':
     # default maximum iteration at 1000
     iteration = 1000 if args.iteration is None else int(args.iteration)
     # validate user input
-    if validate_state(init_state, goal_state, width, height):
-        s = Solver(init_state, goal_state, width)
-        # use DFS
-        if args.subparser_name == 'DFS':
-            if args.limit is None:
-                s.search_DFS(iteration=iteration)
-            else:
-                s.search_IDDFS(limit=int(args.limit), iteration=iteration)
-        else:
-            # check if h1 and h2 are selected. Only one heuristic function can be selected.
-            heuristic_type = None
-            if args.h1 is True and args.h2 is True:
-                print('You can only select one of the heuristic functions.')
-                os._exit(1)
-            elif args.h1 is False and args.h2 is False:
-                print('You must select one heuristic function.')
-                os._exit(1)
+    if validate_state(init_state, goal_state, width, height, log):
+        cache = None
+        if args.cache is not None:
+            cache = SolutionCache(args.cache, None if args.cache_size is None else int(args.cache_size))
+        heuristic_type = None
+        if args.subparser_name not in ['DFS', 'LBFS', 'BIBFS']:
+            heuristic_type = select_heuristic(args)
+        # the extra options of the search, i.e. -weight of WASTAR
+        options = {}
+        for name, convert in [('limit', int), ('table', int), ('workers', int), ('memory', int), ('directory', str),
+                              ('weight', float), ('step', float), ('bound', float)]:
+            if getattr(args, name, None) is not None:
+                options[name] = convert(getattr(args, name))
+        if getattr(args, 'path_only', False):
+            options['path_only'] = True
+        # a missing pattern database, or one built for another puzzle, is an input error like the others
+        try:
+            result = solve(init_state, goal_state, width, height, args.subparser_name, heuristic=heuristic_type,
+                           iteration=iteration, timeout=None if args.timeout is None else float(args.timeout),
+                           move_set=args.move_set, pattern_database=getattr(args, 'pdb', None), cache=cache,
+                           sink=sink, backend=args.backend,
+                           progress=None if args.progress is None else int(args.progress), verbose=True,
+                           canonical=args.canonical, profile=args.profile, **options)
+        except (OSError, ValueError) as error:
+            print('Cannot solve the puzzle: ' + str(error), file=log)
+            sys.stdout.flush()
+            os._exit(1)
+        # the goal can never be reached, exit with a distinct status
+        if result.status == 'unsolvable':
+            print('This puzzle is unsolvable.', file=log)
+            sys.stdout.flush()
+            os._exit(2)
+        metrics = result.metrics
+        # save the statistics of the search as JSON
+        if args.metrics is not None:
+            if args.metrics == '-':
+                print(metrics.to_json())
             else:
-                heuristic_type = 'h1' if args.h1 else 'h2'
-            # use BFS
-            if args.subparser_name == 'BFS':
-                s.search_BFS(heuristic_type, iteration=iteration)
-            # use A*
-            if args.subparser_name == 'ASTAR':
-                s.search_Astar(heuristic_type, iteration=iteration)
+                with open(args.metrics, 'w') as file:
+                    file.write(metrics.to_json() + '\n')
+        sink.close()
     else:
-        print('Invalid puzzle configuration.')
+        print('Invalid puzzle configuration.', file=log)
+        sink.close()
 
 
 
@@ -0,0 +1,177 @@
+# -*- coding:utf8 -*-
+"""
+server.py is the long-lived solver service: JSON-RPC 2.0 requests, one per line, over stdin/stdout or a Unix socket
+"""
+from api import solve, valid_states
+from cache import SolutionCache
+from pattern_database import PatternDatabase
+from symmetry import Symmetry
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
+import os
+import sys
+
+
+class SolverService:
+
+    # error codes of JSON-RPC 2.0
+    PARSE_ERROR = -32700
+    INVALID_REQUEST = -32600
+    METHOD_NOT_FOUND = -32601
+    INVALID_PARAMS = -32602
+    INTERNAL_ERROR = -32603
+
+    # parameters of the `solve` method -> argument of api.solve
+    PARAMS = {'init': 'init_state', 'goal': 'goal_state', 'width': 'width', 'height': 'height',
+              'algorithm': 'algorithm', 'heuristic': 'heuristic', 'iteration': 'iteration', 'timeout': 'timeout',
+              'moves': 'move_set', 'pdb': 'pattern_database', 'weight': 'weight', 'step': 'step', 'bound': 'bound',
+              'limit': 'limit', 'pathonly': 'path_only', 'table': 'table', 'workers': 'workers', 'memory': 'memory',
+              'directory': 'directory', 'canonical': 'canonical', 'profile': 'profile'}
+
+    # `cache` is the path of the SolutionCache file used by every request, `cache_size` its capacity
+    # the move tables, the loaded pattern databases and the cache stay warm between requests
+    def __init__(self, cache=None, cache_size=None):
+        self.__cache_file = cache
+        self.__cache_size = cache_size
+        self.__cache = None
+        # loaded pattern databases by (path, goal state, width, move set)
+        self.__databases = {}
+        # the searches run one at a time in this thread, which also owns the SQLite connection of the cache
+        self.__executor = ThreadPoolExecutor(max_workers=1)
+        self.__stopped = False
+
+    # the methods of the service:
+    # - `solve` takes the PARAMS (`init`, `goal`, `width` and `height` are required) and returns the result of
+    #   api.solve as a dict, with the move names as `directions`
+    # - `shutdown` stops the service after answering
+    # returns the response as a dict, or None for a notification (a request without id)
+    def handle(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            return self.__error__(None, SolverService.PARSE_ERROR, str(error))
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return self.__error__(None, SolverService.INVALID_REQUEST, 'Invalid request')
+        identifier = request.get('id')
+        params = request.get('params', {})
+        if request['method'] == 'solve':
+            if not isinstance(params, dict):
+                return self.__error__(identifier, SolverService.INVALID_PARAMS, 'The params must be an object')
+            try:
+                result = self.__solve__(params)
+            except (ValueError, TypeError, KeyError, IndexError, OSError) as error:
+                return self.__error__(identifier, SolverService.INVALID_PARAMS, str(error))
+            except Exception as error:
+                return self.__error__(identifier, SolverService.INTERNAL_ERROR, str(error))
+        elif request['method'] == 'shutdown':
+            self.__stopped = True
+            result = None
+        else:
+            return self.__error__(identifier, SolverService.METHOD_NOT_FOUND, 'Unknown method: ' + request['method'])
+        if 'id' not in request:
+            return None
+        return {'jsonrpc': '2.0', 'id': identifier, 'result': result}
+
+    # answer the requests read from stdin on stdout until the end of the input or a shutdown
+    async def serve_stdio(self):
+        loop = asyncio.get_running_loop()
+        while not self.__stopped:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                break
+            response = await self.__respond__(line)
+            if response is not None:
+                sys.stdout.write(response)
+                sys.stdout.flush()
+        await self.close()
+
+    # answer the requests of every client connected to the Unix socket at `path` until a shutdown
+    async def serve_unix(self, path):
+        stopped = asyncio.Event()
+        clients = set()
+
+        async def connect(reader, writer):
+            clients.add(writer)
+            try:
+                while not self.__stopped:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    response = await self.__respond__(line)
+                    if response is not None:
+                        writer.write(response.encode())
+                        await writer.drain()
+            finally:
+                clients.discard(writer)
+                writer.close()
+                if self.__stopped:
+                    stopped.set()
+
+        server = await asyncio.start_unix_server(connect, path=path)
+        try:
+            await stopped.wait()
+        finally:
+            server.close()
+            for writer in clients:
+                writer.close()
+            await server.wait_closed()
+            if os.path.exists(path):
+                os.remove(path)
+            await self.close()
+
+    # close the cache and stop the search thread
+    async def close(self):
+        if self.__cache is not None:
+            await asyncio.get_running_loop().run_in_executor(self.__executor, self.__cache.close)
+            self.__cache = None
+        self.__executor.shutdown()
+
+    # handle a request line in the search thread, returns the response line or None
+    async def __respond__(self, line):
+        response = await asyncio.get_running_loop().run_in_executor(self.__executor, self.handle, line)
+        if response is None:
+            return None
+        return json.dumps(response, separators=(',', ':')) + '\n'
+
+    # run api.solve with the parameters of a request
+    def __solve__(self, params):
+        unknown = set(params) - set(SolverService.PARAMS)
+        if unknown:
+            raise ValueError('Unknown params: ' + ', '.join(sorted(unknown)))
+        arguments = {SolverService.PARAMS[name]: value for name, value in params.items()}
+        for name in ['init_state', 'goal_state', 'width', 'height']:
+            if name not in arguments:
+                raise ValueError('Missing param: ' + name)
+        if self.__cache_file is not None and self.__cache is None:
+            self.__cache = SolutionCache(self.__cache_file, self.__cache_size)
+        # the workers of the parallel search load the pattern database from its file
+        if arguments.get('pattern_database') is not None and arguments.get('workers') is None:
+            goal_state = arguments['goal_state']
+            # a canonical search needs the database of the canonical goal
+            if arguments.get('canonical') and valid_states(goal_state, goal_state, arguments['width'],
+                                                           arguments['height']):
+                goal_state = list(Symmetry.canonical_goal(bytes(goal_state), arguments['width'],
+                                                          arguments['height']))
+            arguments['pattern_database'] = self.__load_database__(arguments['pattern_database'], goal_state,
+                                                                   arguments['width'], arguments.get('move_set', '8'))
+        result = solve(cache=self.__cache, **arguments)
+        response = result.to_dict()
+        if result.path:
+            response['directions'] = ' '.join(result.get_directions())
+        return response
+
+    # the pattern database of a goal state, loaded once
+    def __load_database__(self, path, goal_state, width, move_set):
+        key = (path, tuple(goal_state), width, move_set)
+        if key not in self.__databases:
+            goal_position = [0] * len(goal_state)
+            for idx, tile in enumerate(goal_state):
+                goal_position[tile] = idx
+            self.__databases[key] = PatternDatabase.load(path, goal_position, width, move_set)
+        return self.__databases[key]
+
+    # a JSON-RPC error response
+    @staticmethod
+    def __error__(identifier, code, message):
+        return {'jsonrpc': '2.0', 'id': identifier, 'error': {'code': code, 'message': message}}
@@ -0,0 +1,117 @@
+# -*- coding:utf8 -*-
+"""
+sink.py contains the outputs the solutions of the searches are written to
+"""
+from moves import MoveTable
+from abc import ABC, abstractmethod
+import json
+import sys
+
+
+class ResultSink(ABC):
+
+    # size of the write buffer of the files opened by a sink
+    BUFFER = 1 << 16
+
+    # `path` is the file the results are written to, '-' for stdout
+    def __init__(self, path='-'):
+        if path == '-':
+            self._stream = sys.stdout
+        else:
+            self._stream = open(path, 'w', buffering=ResultSink.BUFFER)
+
+    # create the sink by its command line name
+    # `text` without a path keeps the legacy report, one `{name}.txt` file per search
+    @staticmethod
+    def create(mode, path=None):
+        if mode == 'text':
+            return TextSink(path)
+        if mode == 'jsonl':
+            return JsonSink('-' if path is None else path)
+        if mode == 'moves':
+            return MovesSink('-' if path is None else path)
+        if mode == 'null':
+            return NullSink()
+        raise ValueError('Unknown output mode: ' + str(mode))
+
+    # write the solution of a search
+    # `name` is the name of the search (i.e. puzzleAs-h1), the states and the boards of `path` are packed,
+    # `time` is the time to solution in seconds and `steps` the number of expanded nodes
+    @abstractmethod
+    def write(self, name, width, init_state, goal_state, path, time, steps):
+        pass
+
+    # the solutions are written to stdout, the human readable log must go elsewhere
+    def is_stdout(self):
+        return self._stream is sys.stdout
+
+    # flush the buffer, the file is closed unless it is stdout
+    def close(self):
+        if self._stream is sys.stdout:
+            self._stream.flush()
+        else:
+            self._stream.close()
+
+
+class TextSink(ResultSink):
+
+    # the human readable report, every board of the path as rows
+    # without a path, each result goes to a new `{name}.txt` file in the working directory
+    def __init__(self, path=None):
+        if path is not None:
+            super().__init__(path)
+        else:
+            self._stream = None
+
+    def write(self, name, width, init_state, goal_state, path, time, steps):
+        lines = [name, '', 'Initial State:']
+        lines += [str(list(init_state[idx:idx+width])) for idx in range(0, len(init_state), width)]
+        lines += ['', 'Goal State:']
+        lines += [str(list(goal_state[idx:idx+width])) for idx in range(0, len(goal_state), width)]
+        lines += ['', 'Puzzle solution path:']
+        for state in path:
+            lines.append('--------------------')
+            lines += [str(list(state[idx:idx+width])) for idx in range(0, len(state), width)]
+        lines.append('--------------------')
+        lines += ['', 'The puzzle is solved after ' + str(time)]
+        lines.append('Shortest path: ' + str(len(path)) + ' steps.')
+        lines.append('Searched nodes: ' + str(steps) + '.')
+        if self._stream is None:
+            with open(name + '.txt', 'w', buffering=ResultSink.BUFFER) as file:
+                file.write('\n'.join(lines))
+        else:
+            self._stream.write('\n'.join(lines) + '\n\n')
+
+    def close(self):
+        if self._stream is not None:
+            super().close()
+
+
+class JsonSink(ResultSink):
+
+    # one compact JSON object per solution, the boards of the path are flat lists
+    def write(self, name, width, init_state, goal_state, path, time, steps):
+        self._stream.write(json.dumps({'search': name, 'width': width, 'init': list(init_state),
+                                       'goal': list(goal_state), 'moves': len(path) - 1, 'time': time,
+                                       'nodes': steps, 'path': [list(state) for state in path]},
+                                      separators=(',', ':')) + '\n')
+
+
+class MovesSink(ResultSink):
+
+    # one line of move names per solution (see MoveTable.NAMES), i.e. `U UR L`
+    def write(self, name, width, init_state, goal_state, path, time, steps):
+        self._stream.write(' '.join(MoveTable.directions(path, width)) + '\n')
+
+
+class NullSink(ResultSink):
+
+    # discard the solutions
+    def __init__(self):
+        self._stream = None
+
+    def write(self, name, width, init_state, goal_state, path, time, steps):
+        pass
+
+    def close(self):
+        pass
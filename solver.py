@@ -4,304 +4,1196 @@ solver.py contains all the implementation of heuristic search algorithms
 """
 from queue import PriorityQueue, Queue
 from state import State
+from heuristic import Heuristic
+from pattern_database import PatternDatabase
+from metrics import SearchMetrics
+from moves import MoveTable
+from cache import SolutionCache
+from sink import TextSink, NullSink
+from frontier import FrontierSearch
+from parallel import ParallelAstar
+from vectorized import VectorBackend
+from symmetry import Symmetry
+from itertools import chain
+import heapq
+import random
+import sys
 import time
-import copy
 
 
 class Solver:
 
-    def __init__(self, init_state, goal_state, width):
-        self.__init_state = self.__convert_state__(init_state, width)
-        self.__goal_state = self.__convert_state__(goal_state, width)
+    # `pattern_database` is the path of a pattern database file built for this goal, used by the `pdb` heuristic
+    # `timeout` is the maximum time of a search in seconds, on top of its `iteration` budget
+    # `verbose` set to False runs the searches without printing, and without saving the result unless `sink` is set
+    # `progress` prints a progress line to stderr every `progress` expanded nodes
+    # every search returns a SearchMetrics with its statistics
+    # `move_set` is `8` (every neighbour of the blank, the default) or `4` (orthogonal neighbours only)
+    # `cache` is a SolutionCache or the path of its file, a cached solution is returned without searching
+    # `sink` is the ResultSink the solutions are written to, by default the legacy `{search}.txt` report
+    # `backend` set to `numpy` expands batches of nodes with NumPy in A* and layered BFS (see VectorBackend)
+    # `canonical` solves the canonical form of the instance instead (see Symmetry), so the cache is shared by
+    # the instances differing by a symmetry of the board or the labels of the tiles. The paths are mapped back
+    # to the instance, the pattern database must be built for the canonical goal (see Symmetry.canonical_goal)
+    # `profile` measures the time of the successor generation, heuristic evaluation and open list phases. The clock
+    # calls around every child slow the searches down, so the phase times of the metrics stay at 0 without it
+    def __init__(self, init_state, goal_state, width, pattern_database=None, timeout=None, verbose=True,
+                 progress=None, move_set='8', cache=None, sink=None, backend='python', canonical=False, profile=False):
+        self.__width = width
+        self.__height = len(init_state) // width
+        # the neighbours of every blank position, built once per geometry and move set
+        self.__moves = MoveTable.get(width, self.__height, move_set)
+        # boards are packed into flat `bytes`, one byte per tile
+        self.__init_state = self.__pack_state__(init_state)
+        self.__goal_state = self.__pack_state__(goal_state)
+        # the instance as given, the searches run on the canonical one when `canonical` is set
+        self.__instance = (self.__init_state, self.__goal_state)
+        self.__symmetry = None
+        if canonical:
+            self.__symmetry, self.__init_state, self.__goal_state = Symmetry.canonicalize(
+                self.__init_state, self.__goal_state, width, self.__height)
+        # goal-position table: goal_position[tile] is the index of the tile on the flat goal board
+        self.__goal_position = [0] * len(self.__goal_state)
+        for idx, tile in enumerate(self.__goal_state):
+            self.__goal_position[tile] = idx
+        self.__pattern_database = pattern_database
+        self.__backend = VectorBackend(self.__moves, self.__goal_position) if backend == 'numpy' else None
+        # the file of the pattern database, loaded again by the workers of the parallel search
+        self.__pattern_database_file = pattern_database
+        self.__timeout = timeout
+        self.__deadline = None
+        self.__verbose = verbose
+        self.__profile = profile
+        self.__progress = progress
+        self.__cache = cache
+        if sink is None:
+            sink = TextSink() if verbose else NullSink()
+        self.__sink = sink
+        # the progress and results are printed to stderr when the sink writes the solutions to stdout
+        self.__log_stream = sys.stderr if sink.is_stdout() else sys.stdout
         self.__path = []
         self.__steps = 0
 
+    # check if the goal state can be reached from the initial state with the moves of the move set
+    # - on a single row or column the tiles can never pass each other, so their order must be the same
+    # - with orthogonal moves only, every move is one swap of the blank and moves it by one row or column,
+    #   so the parity of the permutation from init to goal must equal the parity of the blank's distance
+    # - with diagonal moves as well, the blank can rotate three tiles and every permutation is reachable
+    def is_solvable(self):
+        if self.__width == 1 or self.__height == 1:
+            return [tile for tile in self.__init_state if tile] == [tile for tile in self.__goal_state if tile]
+        if self.__moves.has_diagonals():
+            return True
+        # parity of the permutation: a cycle of length k is k - 1 swaps
+        permutation = [self.__goal_position[tile] for tile in self.__init_state]
+        visited = [False] * len(permutation)
+        swaps = 0
+        for start in range(len(permutation)):
+            cell = start
+            length = 0
+            while not visited[cell]:
+                visited[cell] = True
+                cell = permutation[cell]
+                length += 1
+            swaps += max(length - 1, 0)
+        init_x, init_y = divmod(self.__init_state.index(0), self.__width)
+        goal_x, goal_y = divmod(self.__goal_state.index(0), self.__width)
+        return swaps % 2 == (abs(init_x - goal_x) + abs(init_y - goal_y)) % 2
+
     # Iterative Deepening Depth-First Search
     # I use IDDFS as the default algorithm for DFS search since DFS doesn't yield good result.
-    # IDDFS is built on DFS
-    def search_IDDFS(self, limit, iteration):
+    # IDDFS is built on the path-only DFS: a DFS remembering every board it has seen closes a board first reached
+    # deep, and the depth limit then cuts every shallower path through it. `table` is the size of the optional
+    # transposition table of each round (see search_DFS)
+    def search_IDDFS(self, limit, iteration, table=None):
         current_limit = 0
-        # Iteratively increase the depth limit and run DFS
+        metrics = self.__new_metrics__('IDDFS')
+        # the timeout covers all the rounds
+        self.__start_budget__()
+        # Iteratively increase the depth limit and run DFS, each depth gets the full iteration budget
         while current_limit < limit:
-            self.search_DFS(limit=current_limit, iteration=iteration)
+            self.__path = []
+            self.__steps = 0
+            metrics.merge(self.search_DFS(limit=current_limit, iteration=iteration, path_only=True, table=table))
             current_limit += 1
             if len(self.__path) > 0:
                 break
+        return self.__finish_metrics__(metrics)
+
+    # Iterative Deepening A* Search
+    # Depth-first searches bounded by f(n) = g(n) + h(n), raising the bound to the smallest f(n) that exceeded it
+    # Only the current path is kept: moves are applied to and undone on a single mutable board,
+    # and the move undoing the parent's move is never tried
+    # `heuristic_type` takes either `h1`, `h2` or `pdb`
+    # `iteration` is the maximum number of expanded nodes over all the rounds
+    def search_IDAstar(self, heuristic_type, iteration):
+        self.__log__('\nStarting heuristic search using IDA* with ' + heuristic_type + '......')
+        tic = time.perf_counter()
+        self.__start_budget__()
+        metrics = self.__new_metrics__('IDA*')
+        bound = self.__lookup_cache__(metrics, 'puzzleIDAs-' + heuristic_type)
+        if len(self.__path):
+            return self.__finish_metrics__(metrics)
+        clock = time.perf_counter
+        profile = self.__profile
+        heuristic = self.__create_heuristic__(heuristic_type)
+        moves = self.__moves
+        goal_state = self.__goal_state
+        board = bytearray(self.__init_state)
+        # blank positions along the current path
+        path = []
+
+        # returns True when the goal is found, None when the iteration budget runs out,
+        # otherwise the smallest f(n) above the threshold
+        def expand(blank, g, h, inverse):
+            f = g + h
+            if f > threshold:
+                return f
+            if board == goal_state:
+                return True
+            if not self.__within_budget__(iteration):
+                return None
+            self.__steps += 1
+            # the open list of IDA* is the current path
+            metrics.expand(g, 0)
+            minimum = float('inf')
+            for move, target in moves.get_neighbours(blank):
+                if move == inverse:
+                    continue
+                metrics.generations += 1
+                # h(n) of the child is derived before the move is applied
+                if profile:
+                    start = clock()
+                child_h = heuristic.update(board, blank, target, h)
+                if profile:
+                    metrics.heuristic_time += clock() - start
+                board[blank] = board[target]
+                board[target] = 0
+                path.append(target)
+                result = expand(target, g + 1, child_h, MoveTable.inverse(move))
+                if result is True:
+                    return True
+                # undo the move
+                board[target] = board[blank]
+                board[blank] = 0
+                path.pop()
+                if result is None:
+                    return None
+                minimum = min(minimum, result)
+            return minimum
+
+        blank = self.__init_state.index(0)
+        h = heuristic.evaluate(self.__init_state)
+        # a lower bound proven by an earlier search skips the rounds below it
+        threshold = max(h, bound)
+        while True:
+            result = expand(blank, 0, h, None)
+            if result is True:
+                # replay the moves from the initial state to build the path
+                board = bytearray(self.__init_state)
+                self.__path = [self.__init_state]
+                for target in path:
+                    board[blank] = board[target]
+                    board[target] = 0
+                    blank = target
+                    self.__path.append(bytes(board))
+                tic = time.perf_counter() - tic
+                break
+            if result is None or result == float('inf'):
+                break
+            threshold = result
+        # every round below the threshold failed, so the threshold bounds the cost of any solution
+        self.__store_cache__(heuristic_type != 'h2', threshold)
+        # if no solution is found
+        if len(self.__path) == 0:
+            self.__log__('No solution found within the budget.')
+        # if solution is found, print and save the result in a file
+        else:
+            self.__save_result__('puzzleIDAs-' + heuristic_type, tic)
+        return self.__finish_metrics__(metrics)
 
     # Depth-First Search
     # `iteration` defined the maximum steps the DFS can go
     # `limit` is set to None by default for pure DFS. Should set to INT for IDDFS.
-    def search_DFS(self, iteration, limit=None):
-        print('\nStarting heuristic search using DFS......')
-        tic = time.clock()
+    # `path_only` only avoids the boards of the current path instead of every board ever seen, so the memory grows
+    # with the depth only. `table` adds a transposition table of at most `table` boards (and implies `path_only`)
+    # with a `limit`, only the path-only modes find every path within it: the default one never reopens a board, so a
+    # board first reached deep cuts the shallower paths through it (search_IDDFS always runs the path-only DFS)
+    def search_DFS(self, iteration, limit=None, path_only=False, table=None):
+        if path_only or table is not None:
+            return self.__search_path_DFS__(iteration, limit, table)
+        self.__log__('\nStarting heuristic search using DFS......')
+        tic = time.perf_counter()
+        # IDDFS (with a depth limit) starts the timeout once for all its rounds
+        if limit is None:
+            self.__start_budget__()
+        metrics = self.__new_metrics__('DFS')
+        self.__lookup_cache__(metrics, 'puzzleDFS')
+        if len(self.__path):
+            return self.__finish_metrics__(metrics)
+        clock = time.perf_counter
+        profile = self.__profile
         # create open_list (stack) for storing non-explored nodes (node object)
         open_list = []
-        # plain_open_list is to save the puzzle only without any info about the tree (list)
+        # plain_open_list is to save the puzzle only without any info about the tree (set of packed boards)
         # this gives constant complexity when checking if a new child is in open_list
-        plain_open_list = []
-        # create close_list for storing explored nodes (list)
-        close_list = []
+        plain_open_list = set()
+        # create close_list for storing explored nodes (set of packed boards)
+        close_list = set()
         # put initial state (node object) in the open_list and plain_open_list
-        init_state = State(self.__init_state, self.__goal_state, 0)
+        init_state = State(self.__init_state, 0)
         open_list.append(init_state)
-        plain_open_list.append(self.__init_state)
+        plain_open_list.add(self.__init_state)
         # start searching
-        while len(open_list) > 0 and self.__steps < iteration:
+        while len(open_list) > 0 and self.__within_budget__(iteration):
+            if profile:
+                start = clock()
             current_state = open_list.pop()
-            plain_open_list.remove(current_state.get_state())
+            plain_open_list.discard(current_state.get_state())
+            if profile:
+                metrics.queue_time += clock() - start
             # check if goal state is reached
             if current_state.get_state() == self.__goal_state:
                 self.__create_path__(current_state)
-                tic = time.clock() - tic
+                tic = time.perf_counter() - tic
                 self.__steps += 1
+                metrics.expand(len(open_list), len(close_list))
                 break
             # if reach the limit (for iterative deepening)
             elif limit is not None and current_state.get_depth() + 1 > limit:
                 self.__steps += 1
+                metrics.expand(len(open_list), len(close_list))
                 continue
             # search for children
             else:
                 # find all the possible moves based on current state
-                for state in self.__find_possible_states__(current_state.get_state()):
+                if profile:
+                    start = clock()
+                children = self.__find_possible_states__(current_state.get_state(), current_state.get_blank())
+                if profile:
+                    metrics.successor_time += clock() - start
+                metrics.generations += len(children)
+                for state, blank in children:
                     # check if this state is in open_list or close_list
                     if state not in close_list and state not in plain_open_list:
                         # create state node, push to open_list
-                        new_state = State(state, self.__goal_state, current_state.get_depth() + 1, current_state)
+                        new_state = State(state, current_state.get_depth() + 1, current_state, blank)
                         open_list.append(new_state)
-                        plain_open_list.append(state)
+                        plain_open_list.add(state)
+                    else:
+                        metrics.duplicates += 1
                 # add the current state to close_list
-                close_list.append(current_state.get_state())
+                close_list.add(current_state.get_state())
                 self.__steps += 1
+                metrics.expand(len(open_list), len(close_list))
         # if no solution is found
         if len(self.__path) == 0:
-            print('This puzzle is unsolvable.' if limit is None else 'This puzzle is unsolvable with depth limit ' + str(limit))
+            self.__log__('No solution found within the budget.' if limit is None else 'No solution found within depth limit ' + str(limit))
         # if solution is found, print and save the result in a file
         else:
             self.__save_result__('puzzleDFS', tic)
+        return self.__finish_metrics__(metrics)
+
+    # the path-only mode of DFS
+    # the moves are applied to and undone on a single mutable board, and the stack holds the index of the next
+    # neighbour to try at each depth. A cycle is detected on the current path with a set of Zobrist hashes
+    # (the XOR of a random key per tile and cell) updated on every push and pop. The transposition table keeps the
+    # smallest depth each board was reached at and skips a board reached again no shallower; once it holds `table`
+    # boards no new ones are added, keeping the ones closest to the root
+    def __search_path_DFS__(self, iteration, limit, table):
+        self.__log__('\nStarting heuristic search using DFS......')
+        tic = time.perf_counter()
+        if limit is None:
+            self.__start_budget__()
+        metrics = self.__new_metrics__('DFS')
+        self.__lookup_cache__(metrics, 'puzzleDFS')
+        if len(self.__path):
+            return self.__finish_metrics__(metrics)
+        cells = len(self.__init_state)
+        # keys[cell][tile], the same for every search of this size
+        rng = random.Random(cells)
+        keys = [[rng.getrandbits(64) for _ in range(cells)] for _ in range(cells)]
+        neighbours = [self.__moves.get_neighbours(blank) for blank in range(cells)]
+        inverse = MoveTable.inverse
+        goal_state = self.__goal_state
+        board = bytearray(self.__init_state)
+        key = 0
+        for cell, tile in enumerate(board):
+            key ^= keys[cell][tile]
+        # per depth: index of the next neighbour, blank position, move that led there and hash of the board
+        stack = [0]
+        blanks = [board.index(0)]
+        moves = [None]
+        path = {key}
+        hashes = [key]
+        transpositions = None if table is None else {key: 0}
+        self.__steps += 1
+        metrics.expand(1, 0)
+        found = board == goal_state
+        while stack and not found:
+            depth = len(stack) - 1
+            blank = blanks[-1]
+            index = stack[-1]
+            candidates = neighbours[blank]
+            if index >= len(candidates) or (limit is not None and depth >= limit):
+                # backtrack: undo the move that led to this board
+                stack.pop()
+                blanks.pop()
+                moves.pop()
+                path.discard(hashes.pop())
+                if blanks:
+                    board[blank] = board[blanks[-1]]
+                    board[blanks[-1]] = 0
+                continue
+            stack[-1] = index + 1
+            move, target = candidates[index]
+            # the move undoing the previous one always closes a cycle
+            if moves[-1] is not None and move == inverse(moves[-1]):
+                continue
+            metrics.generations += 1
+            tile = board[target]
+            child = hashes[-1] ^ keys[target][tile] ^ keys[blank][tile] ^ keys[target][0] ^ keys[blank][0]
+            if child in path:
+                metrics.duplicates += 1
+                continue
+            if transpositions is not None:
+                seen = transpositions.get(child)
+                if seen is not None and seen <= depth + 1:
+                    metrics.duplicates += 1
+                    continue
+                if seen is not None or len(transpositions) < table:
+                    transpositions[child] = depth + 1
+            if not self.__within_budget__(iteration):
+                break
+            board[blank] = tile
+            board[target] = 0
+            stack.append(0)
+            blanks.append(target)
+            moves.append(move)
+            path.add(child)
+            hashes.append(child)
+            self.__steps += 1
+            metrics.expand(len(stack), 0 if transpositions is None else len(transpositions))
+            found = board == goal_state
+        if found:
+            # replay the blank positions from the initial state to build the path
+            board = bytearray(self.__init_state)
+            self.__path = [self.__init_state]
+            for blank, target in zip(blanks, blanks[1:]):
+                board[blank] = board[target]
+                board[target] = 0
+                self.__path.append(bytes(board))
+            tic = time.perf_counter() - tic
+            self.__save_result__('puzzleDFS', tic)
+        else:
+            self.__log__('No solution found within the budget.' if limit is None else 'No solution found within depth limit ' + str(limit))
+        return self.__finish_metrics__(metrics)
 
     # Breadth-First Search
-    # `heuristic_type` takes either `h1` or `h2`
-    # `h1` stands for hamming distance, and `h2` is the sum of permutation
+    # `heuristic_type` takes either `h1`, `h2` or `pdb`
+    # `h1` stands for hamming distance, `h2` is the sum of permutation and `pdb` is the pattern database
     # `iteration` is the maximum step of the search
     def search_BFS(self, heuristic_type, iteration):
-        print('\nStarting heuristic search using BFS with ' + heuristic_type + '......')
-        tic = time.clock()
+        self.__log__('\nStarting heuristic search using BFS with ' + heuristic_type + '......')
+        tic = time.perf_counter()
+        self.__start_budget__()
+        metrics = self.__new_metrics__('BFS')
+        self.__lookup_cache__(metrics, 'puzzleBFS-' + heuristic_type)
+        if len(self.__path):
+            return self.__finish_metrics__(metrics)
+        clock = time.perf_counter
+        profile = self.__profile
+        heuristic = self.__create_heuristic__(heuristic_type)
         # create open_list (queue) for storing non-explored nodes (node object)
         open_list = Queue()
-        # plain_open_list is to save the puzzle only without any info about the tree (list)
+        # plain_open_list is to save the puzzle only without any info about the tree (set of packed boards)
         # this gives constant complexity when checking if a new child is in open_list
-        plain_open_list = []
-        # create close_list for storing explored nodes (list)
-        close_list = []
+        plain_open_list = set()
+        # create close_list for storing explored nodes (set of packed boards)
+        close_list = set()
         # put initial state (node object) in the open_list and plain_open_list
-        init_state = State(self.__init_state, self.__goal_state, 0)
+        init_state = State(self.__init_state, 0, heuristic=heuristic.evaluate(self.__init_state))
         open_list.put(init_state)
-        plain_open_list.append(self.__init_state)
+        plain_open_list.add(self.__init_state)
         # start searching
-        while open_list.qsize() and self.__steps < iteration:
+        while open_list.qsize() and self.__within_budget__(iteration):
+            if profile:
+                start = clock()
             current_state = open_list.get()
-            plain_open_list.remove(current_state.get_state())
+            plain_open_list.discard(current_state.get_state())
+            if profile:
+                metrics.queue_time += clock() - start
             # check if goal state is reached
             if current_state.get_state() == self.__goal_state:
                 self.__create_path__(current_state)
-                tic = time.clock() - tic
+                tic = time.perf_counter() - tic
                 self.__steps += 1
+                metrics.expand(open_list.qsize(), len(close_list))
                 break
             # search for children
             else:
                 new_state_list = []
                 # find all the possible moves based on current state
-                for state in self.__find_possible_states__(current_state.get_state()):
+                parent = current_state.get_state()
+                if profile:
+                    start = clock()
+                children = self.__find_possible_states__(parent, current_state.get_blank())
+                if profile:
+                    metrics.successor_time += clock() - start
+                metrics.generations += len(children)
+                for state, blank in children:
                     # check if this state is in open_list or close_list
                     if state not in close_list and state not in plain_open_list:
-                        # create state node, add to a temp list
-                        new_state = State(state, self.__goal_state, current_state.get_depth() + 1, current_state)
+                        # create state node with h(s) derived from the parent's, add to a temp list
+                        if profile:
+                            start = clock()
+                        h = heuristic.update(parent, current_state.get_blank(), blank, current_state.get_h())
+                        if profile:
+                            metrics.heuristic_time += clock() - start
+                        new_state = State(state, current_state.get_depth() + 1, current_state, blank, h)
                         new_state_list.append(new_state)
-                        plain_open_list.append(state)
-                # if hamming distance, sort the temp list based on f(s) = g(s) + h1(s)
-                if heuristic_type == 'h1':
-                    new_state_list = sorted(new_state_list, key=lambda x: x.get_h1())
-                # if sum of permutation, sort the temp list based on f(s) = g(s) + h2(s)
-                else:
-                    new_state_list = sorted(new_state_list, key=lambda x: x.get_h2())
+                        plain_open_list.add(state)
+                    else:
+                        metrics.duplicates += 1
+                # sort the temp list based on f(s) = g(s) + h(s), siblings share g(s)
+                if profile:
+                    start = clock()
+                new_state_list = sorted(new_state_list, key=lambda x: x.get_h())
                 # add the state nodes in the temp list to open_list
                 for state in new_state_list:
                     open_list.put(state)
-                close_list.append(current_state.get_state())
+                if profile:
+                    metrics.queue_time += clock() - start
+                close_list.add(current_state.get_state())
                 self.__steps += 1
+                metrics.expand(open_list.qsize(), len(close_list))
         # if no solution is found
         if len(self.__path) == 0:
-            print('This puzzle is unsolvable.')
+            self.__log__('No solution found within the budget.')
         # if solution is found, print and save the result in a file
         else:
-            self.__save_result__('puzzleBFS-h1' if heuristic_type is 'h1' else 'puzzleBFS-h2', tic)
+            self.__save_result__('puzzleBFS-' + heuristic_type, tic)
+        return self.__finish_metrics__(metrics)
 
     # A* Algorithm Search
-    # `heuristic_type` takes either `h1` or `h2`
-    # `h1` stands for hamming distance, and `h2` is the sum of permutation
+    # `heuristic_type` takes either `h1`, `h2` or `pdb`
+    # `h1` stands for hamming distance, `h2` is the sum of permutation and `pdb` is the pattern database
     # `iteration` is the maximum step of the search
     def search_Astar(self, heuristic_type, iteration):
-        print('\nStarting heuristic search using A* with ' + heuristic_type + '......')
-        tic = time.clock()
-        # create open_list (priority queue)for storing non-explored nodes (node object)
+        if self.__backend is not None:
+            return self.__search_Astar_batches__(heuristic_type, iteration)
+        self.__log__('\nStarting heuristic search using A* with ' + heuristic_type + '......')
+        tic = time.perf_counter()
+        self.__start_budget__()
+        metrics = self.__new_metrics__('A*')
+        self.__lookup_cache__(metrics, 'puzzleAs-' + heuristic_type)
+        if len(self.__path):
+            return self.__finish_metrics__(metrics)
+        clock = time.perf_counter
+        profile = self.__profile
+        heuristic = self.__create_heuristic__(heuristic_type)
+        # create open_list (binary heap) of (f(n), h(n), order, node) entries, so ties on f(n) go to the lower h(n)
+        # an improved path pushes a new entry, the stale one is skipped when popped (lazy deletion)
         open_list = []
-        # plain_open_list is to save the puzzle only without any info about the tree (list)
-        # this gives constant complexity when checking if a new child is in open_list
-        plain_open_list = []
-        # create close_list for storing explored nodes (list)
-        close_list = []
-        # put initial state (node object) in the open_list and plain_open_list
-        init_state = State(self.__init_state, self.__goal_state, 0)
-        open_list.append(init_state)
-        plain_open_list.append(self.__init_state)
+        # best_g maps the puzzle (packed board) to the lowest g(n) found so far
+        # this gives constant complexity when checking if a child improves on a known path
+        best_g = {}
+        # `order` breaks the remaining ties in insertion order, nodes themselves are never compared
+        order = 0
+        # put initial state (node object) in the open_list, h(n) is computed once per node
+        h = heuristic.evaluate(self.__init_state)
+        init_state = State(self.__init_state, 0, heuristic=h)
+        heapq.heappush(open_list, (h, h, order, init_state))
+        best_g[self.__init_state] = 0
         # start searching
-        while len(open_list) and self.__steps < iteration:
+        while len(open_list) and self.__within_budget__(iteration):
             # set the current state to the state has lowest f(n)
-            if heuristic_type == 'h1':
-                current_state = min(sorted(open_list, key=lambda x: x.get_h1() + x.get_g()))
-            else:
-                current_state = min(sorted(open_list, key=lambda x: x.get_h2() + x.get_g()))
+            if profile:
+                start = clock()
+            current_state = heapq.heappop(open_list)[3]
+            if profile:
+                metrics.queue_time += clock() - start
+            # skip stale entries that were superseded by a cheaper path
+            if current_state.get_g() > best_g[current_state.get_state()]:
+                continue
             # check if goal state is reached
             if current_state.get_state() == self.__goal_state:
                 self.__create_path__(current_state)
-                tic = time.clock() - tic
+                tic = time.perf_counter() - tic
                 self.__steps += 1
+                metrics.expand(len(open_list), len(best_g))
                 break
             # search for children
             else:
+                new_evaluation = current_state.get_g() + 1
+                parent = current_state.get_state()
                 # find all the possible moves based on current state
-                for state in self.__find_possible_states__(current_state.get_state()):
-                    # check if this state is in close_list
-                    if state in close_list:
+                if profile:
+                    start = clock()
+                children = self.__find_possible_states__(parent, current_state.get_blank())
+                if profile:
+                    metrics.successor_time += clock() - start
+                metrics.generations += len(children)
+                for state, blank in children:
+                    # skip the child unless this is the cheapest path to it so far
+                    if new_evaluation >= best_g.get(state, new_evaluation + 1):
+                        metrics.duplicates += 1
+                        continue
+                    best_g[state] = new_evaluation
+                    # create new state node, h(n) is derived from the parent's value
+                    if profile:
+                        start = clock()
+                    h = heuristic.update(parent, current_state.get_blank(), blank, current_state.get_h())
+                    if profile:
+                        metrics.heuristic_time += clock() - start
+                    new_state = State(state, current_state.get_depth() + 1, current_state, blank, h)
+                    # set the node's g(n)
+                    new_state.set_g(new_evaluation)
+                    # add to open list
+                    order += 1
+                    if profile:
+                        start = clock()
+                    heapq.heappush(open_list, (new_evaluation + h, h, order, new_state))
+                    if profile:
+                        metrics.queue_time += clock() - start
+                self.__steps += 1
+                # best_g holds every board seen, open or closed
+                metrics.expand(len(open_list), len(best_g))
+        # nodes are expanded by increasing f(n), so the lowest f(n) left on the open list bounds the cost
+        self.__store_cache__(heuristic_type != 'h2', open_list[0][0] if len(open_list) else None)
+        # if no solution is found
+        if len(self.__path) == 0:
+            self.__log__('No solution found within the budget.')
+        # if solution is found, print and save the result in a file
+        else:
+            self.__save_result__('puzzleAs-' + heuristic_type, tic)
+        return self.__finish_metrics__(metrics)
+
+    # A* Algorithm Search with the vectorized backend
+    # The nodes on top of the open list sharing the same f(n) and h(n) (at most CHUNK) are expanded together:
+    # their children are generated and evaluated by NumPy in one call per batch. With a consistent heuristic
+    # (h1, pdb) a child never has a lower f(n) than its parent, so no node of a batch is reached more cheaply
+    # through another one and the path is as short as with search_Astar
+    CHUNK = 1024
+
+    def __search_Astar_batches__(self, heuristic_type, iteration):
+        self.__log__('\nStarting heuristic search using A* with ' + heuristic_type + ' (numpy)......')
+        tic = time.perf_counter()
+        self.__start_budget__()
+        metrics = self.__new_metrics__('A*')
+        self.__lookup_cache__(metrics, 'puzzleAs-' + heuristic_type)
+        if len(self.__path):
+            return self.__finish_metrics__(metrics)
+        clock = time.perf_counter
+        profile = self.__profile
+        backend = self.__backend
+        heuristic = self.__create_heuristic__(heuristic_type)
+        # the backend takes the name of h1 and h2, and the pattern database itself
+        vectorized_heuristic = heuristic if heuristic_type == 'pdb' else heuristic_type
+        # the open list and best_g are the same as in search_Astar
+        open_list = []
+        best_g = {}
+        order = 0
+        h = heuristic.evaluate(self.__init_state)
+        heapq.heappush(open_list, (h, h, order, State(self.__init_state, 0, heuristic=h)))
+        best_g[self.__init_state] = 0
+        while len(open_list) and self.__within_budget__(iteration):
+            # take the nodes with the lowest f(n) and h(n), stale entries are skipped
+            if profile:
+                start = clock()
+            f, h, _, current_state = heapq.heappop(open_list)
+            batch = []
+            while True:
+                if current_state.get_g() <= best_g[current_state.get_state()]:
+                    batch.append(current_state)
+                if not len(open_list) or open_list[0][0] != f or open_list[0][1] != h or len(batch) >= Solver.CHUNK:
+                    break
+                current_state = heapq.heappop(open_list)[3]
+            if profile:
+                metrics.queue_time += clock() - start
+            # check if goal state is reached
+            goal = [node for node in batch if node.get_state() == self.__goal_state]
+            if len(goal):
+                self.__create_path__(goal[0])
+                tic = time.perf_counter() - tic
+                self.__steps += 1
+                metrics.expand(len(open_list), len(best_g))
+                break
+            if not len(batch):
+                continue
+            # generate and evaluate the children of the whole batch
+            if profile:
+                start = clock()
+            children, parents, blanks = backend.expand(backend.to_array(b''.join(node.get_state() for node in batch)))
+            states = backend.to_states(children)
+            if profile:
+                metrics.successor_time += clock() - start
+                start = clock()
+            values = backend.evaluate(children, vectorized_heuristic).tolist()
+            if profile:
+                metrics.heuristic_time += clock() - start
+            metrics.generations += len(states)
+            for state, parent, blank, h in zip(states, parents.tolist(), blanks.tolist(), values):
+                parent = batch[parent]
+                new_evaluation = parent.get_g() + 1
+                # skip the child unless this is the cheapest path to it so far
+                if new_evaluation >= best_g.get(state, new_evaluation + 1):
+                    metrics.duplicates += 1
+                    continue
+                best_g[state] = new_evaluation
+                new_state = State(state, parent.get_depth() + 1, parent, blank, h)
+                new_state.set_g(new_evaluation)
+                order += 1
+                if profile:
+                    start = clock()
+                heapq.heappush(open_list, (new_evaluation + h, h, order, new_state))
+                if profile:
+                    metrics.queue_time += clock() - start
+            self.__steps += len(batch)
+            metrics.expand(len(open_list), len(best_g), len(batch))
+        # nodes are expanded by increasing f(n), so the lowest f(n) left on the open list bounds the cost
+        self.__store_cache__(heuristic_type != 'h2', open_list[0][0] if len(open_list) else None)
+        # if no solution is found
+        if len(self.__path) == 0:
+            self.__log__('No solution found within the budget.')
+        # if solution is found, print and save the result in a file
+        else:
+            self.__save_result__('puzzleAs-' + heuristic_type, tic)
+        return self.__finish_metrics__(metrics)
+
+    # Weighted A* Search
+    # A* on f(n) = g(n) + weight * h(n): expands far fewer nodes, and the path costs at most `weight` times
+    # the shortest one when h(n) is admissible (see __search_anytime__)
+    def search_WAstar(self, heuristic_type, iteration, weight):
+        return self.__search_anytime__(heuristic_type, iteration, weight, 0, None, 'WA*', 'puzzleWAs-' + heuristic_type)
+
+    # Anytime Repairing A* Search (ARA*)
+    # A weighted A* with `weight`, then repeated with the weight lowered by `step` down to 1 while the budget
+    # (iteration and timeout) remains. Each round reuses the g(n) of the previous ones and only re-expands the
+    # boards whose g(n) improved, every round can only improve the path. It stops once the path is proven
+    # to cost at most `bound` times the shortest one (1 for a shortest path)
+    def search_ARAstar(self, heuristic_type, iteration, weight, step, bound=1.0):
+        return self.__search_anytime__(heuristic_type, iteration, weight, step, bound, 'ARA*',
+                                       'puzzleARAs-' + heuristic_type)
+
+    # Greedy Best-First Search
+    # always expands the board with the lowest h(n), the first path found is returned
+    def search_Greedy(self, heuristic_type, iteration):
+        return self.__search_anytime__(heuristic_type, iteration, None, 0, None, 'Greedy',
+                                       'puzzleGreedy-' + heuristic_type)
+
+    # the best-first search behind WA*, ARA* and greedy search (`weight` None orders the boards by h(n) only)
+    # a round expands the open list until the best path found so far costs no more than the lowest key on it.
+    # A closed board reached again through a cheaper path goes to the INCONS list and back to the open list
+    # in the next round. Any path not found yet goes through a board of OPEN or INCONS, so with an admissible
+    # h(n) the path found costs at most g(goal) / min(g(n) + h(n) on OPEN and INCONS) times the shortest one,
+    # or `weight` times after a complete round, this factor is saved as metrics.suboptimality (None with the
+    # inadmissible `h2`). A lower bound from the cache raises that minimum, so a path costing the bound is
+    # proven shortest
+    # when the budget runs out, the best path found so far is returned. A round ending just before the deadline
+    # still scans OPEN and INCONS for the bound and may rebuild the open list, so the search can return up to one
+    # such pass over the open list (about 50 ms with 100000 boards) after the `timeout`
+    def __search_anytime__(self, heuristic_type, iteration, weight, step, bound, algorithm, name):
+        self.__log__('\nStarting heuristic search using ' + algorithm + ' with ' + heuristic_type + '......')
+        tic = time.perf_counter()
+        self.__start_budget__()
+        metrics = self.__new_metrics__(algorithm)
+        cached_bound = self.__lookup_cache__(metrics, name)
+        if len(self.__path):
+            metrics.suboptimality = 1.0
+            return self.__finish_metrics__(metrics)
+        clock = time.perf_counter
+        profile = self.__profile
+        heuristic = self.__create_heuristic__(heuristic_type)
+        admissible = heuristic_type != 'h2'
+
+        def key(node):
+            if weight is None:
+                return node.get_h()
+            return node.get_g() + weight * node.get_h()
+
+        h = heuristic.evaluate(self.__init_state)
+        root = State(self.__init_state, 0, heuristic=h)
+        # best maps the puzzle (packed board) to its node with the lowest g(n), open_nodes and incons to the node
+        # waiting on the open list and the INCONS list, closed is the set of boards expanded in this round
+        best = {self.__init_state: root}
+        open_nodes = {self.__init_state: root}
+        incons = {}
+        closed = set()
+        # open list (binary heap) of (key, h(n), order, node) entries, stale entries are skipped when popped
+        open_list = [(key(root), h, 0, root)]
+        order = 0
+        lower = max(h, cached_bound)
+        goal = None
+        suboptimality = None
+        while True:
+            # a round is complete when no board on the open list has a lower key than the goal
+            complete = False
+            while len(open_list) and self.__within_budget__(iteration):
+                goal = best.get(self.__goal_state)
+                if goal is not None and open_list[0][0] >= key(goal):
+                    complete = True
+                    break
+                if profile:
+                    start = clock()
+                current_state = heapq.heappop(open_list)[3]
+                if profile:
+                    metrics.queue_time += clock() - start
+                parent = current_state.get_state()
+                if open_nodes.get(parent) is not current_state:
+                    continue
+                del open_nodes[parent]
+                closed.add(parent)
+                new_evaluation = current_state.get_g() + 1
+                if profile:
+                    start = clock()
+                children = self.__find_possible_states__(parent, current_state.get_blank())
+                if profile:
+                    metrics.successor_time += clock() - start
+                metrics.generations += len(children)
+                for state, blank in children:
+                    known = best.get(state)
+                    if known is not None and known.get_g() <= new_evaluation:
+                        metrics.duplicates += 1
                         continue
-                    # if state exists in open_list, replace the old one with this one
-                    if state in plain_open_list:
-                        # create new f(n)
-                        new_evaluation = current_state.get_g() + 1
-                        # locate the existing node
-                        for idx, node in enumerate(open_list):
-                            if node.get_state() == state and node.get_g() > new_evaluation:
-                                print('here')
-                                open_list[idx].set_g(new_evaluation)
-                                open_list[idx].set_parent(current_state)
+                    if profile:
+                        start = clock()
+                    h = heuristic.update(parent, current_state.get_blank(), blank, current_state.get_h())
+                    if profile:
+                        metrics.heuristic_time += clock() - start
+                    new_state = State(state, current_state.get_depth() + 1, current_state, blank, h)
+                    new_state.set_g(new_evaluation)
+                    best[state] = new_state
+                    if state in closed:
+                        incons[state] = new_state
                     else:
-                        # create new state node
-                        new_state = State(state, self.__goal_state, current_state.get_depth() + 1, current_state)
-                        # set the node's f(n)
-                        new_state.set_g(current_state.get_g() + 1)
-                        # add to open list
-                        open_list.append(new_state)
-                        plain_open_list.append(state)
-                # add the current state to close_list
-                close_list.append(current_state.get_state())
-                # remove the current state from open list
-                plain_open_list.remove(current_state.get_state())
-                open_list.remove(current_state)
+                        open_nodes[state] = new_state
+                        order += 1
+                        if profile:
+                            start = clock()
+                        heapq.heappush(open_list, (key(new_state), h, order, new_state))
+                        if profile:
+                            metrics.queue_time += clock() - start
                 self.__steps += 1
+                metrics.expand(len(open_nodes), len(best))
+            goal = best.get(self.__goal_state)
+            # the lowest cost any path not found yet can have. The scan takes as long as a few thousand expansions,
+            # so past the deadline the bound of the previous round (or h(n) of the initial state) is kept: the lowest
+            # g(n) + h(n) on OPEN and INCONS never decreases with a consistent h(n), so it is still a lower bound
+            if not self.__past_deadline__():
+                lower = max(min((node.get_g() + node.get_h() for node in chain(open_nodes.values(), incons.values())),
+                                default=float('inf')), cached_bound)
+            if goal is not None:
+                improved = len(self.__path) == 0 or goal.get_g() < len(self.__path) - 1
+                if improved:
+                    self.__path = []
+                    self.__create_path__(goal)
+                if admissible:
+                    suboptimality = max(1.0, (len(self.__path) - 1) / lower) if lower > 0 else 1.0
+                    # a complete weighted round also proves the weight itself
+                    if complete and weight is not None:
+                        suboptimality = min(suboptimality, weight)
+                if improved:
+                    self.__log__('Found a path of ' + str(len(self.__path) - 1) + ' moves' +
+                                 ('' if suboptimality is None else
+                                  ', at most ' + str(suboptimality) + ' times the shortest'))
+            # WA* and greedy search run one round, ARA* stops at the bound, at weight 1 or at the end of the budget
+            if goal is None or bound is None or suboptimality is None or suboptimality <= bound or weight <= 1 or \
+                    not len(open_list) or not self.__within_budget__(iteration):
+                break
+            # next round: lower the weight, move INCONS to the open list and reorder it
+            weight = max(1.0, weight - step)
+            open_nodes.update(incons)
+            incons = {}
+            closed = set()
+            open_list = [(key(node), node.get_h(), order + idx, node) for idx, node in enumerate(open_nodes.values())]
+            order += len(open_list)
+            heapq.heapify(open_list)
+        metrics.suboptimality = suboptimality
+        # if no solution is found (the puzzle is solvable, so the budget ran out)
+        if len(self.__path) == 0:
+            self.__store_cache__(admissible, lower if lower < float('inf') else None)
+            self.__log__('No solution found within the budget.')
+        # if solution is found, print and save the result in a file
+        else:
+            tic = time.perf_counter() - tic
+            self.__store_cache__(suboptimality == 1.0)
+            self.__save_result__(name, tic)
+        return self.__finish_metrics__(metrics)
+
+    # Hash-Distributed A* Search (HDA*)
+    # A* on `workers` processes, each board is owned by the worker picked by a hash of the packed board.
+    # Every worker expands its own open list and sends the children it doesn't own to their owners in batches.
+    # The search ends when all workers are idle with no node in flight, so the path is as short as with A*
+    # `heuristic_type` takes either `h1`, `h2` or `pdb`
+    # `iteration` is the maximum number of expanded nodes of all the workers (see ParallelAstar)
+    def search_HDAstar(self, heuristic_type, iteration, workers):
+        self.__log__('\nStarting heuristic search using HDA* with ' + heuristic_type + ' on ' + str(workers) +
+                     ' workers......')
+        tic = time.perf_counter()
+        self.__start_budget__()
+        metrics = self.__new_metrics__('HDA*')
+        self.__lookup_cache__(metrics, 'puzzleHDAs-' + heuristic_type)
+        if len(self.__path):
+            return self.__finish_metrics__(metrics)
+
+        # load the heuristic once here, so an invalid pattern database fails before any worker starts
+        self.__create_heuristic__(heuristic_type)
+        if heuristic_type == 'pdb' and isinstance(self.__pattern_database_file, PatternDatabase):
+            raise ValueError('The parallel search needs the path of the pattern database file')
+
+        # the expanded nodes of all the workers
+        def within_budget(expansions):
+            self.__steps = expansions
+            return self.__within_budget__(iteration)
+
+        search = ParallelAstar(workers, self.__width, self.__height, self.__moves.get_move_set(), self.__goal_position,
+                               heuristic_type, self.__pattern_database_file, iteration)
+        self.__path = search.run(self.__init_state, self.__goal_state, within_budget, metrics)
+        self.__steps = metrics.expansions
         # if no solution is found
         if len(self.__path) == 0:
-            print('This puzzle is unsolvable.')
+            self.__log__('No solution found within the budget.')
         # if solution is found, print and save the result in a file
         else:
-            self.__save_result__('puzzleAs-h1' if heuristic_type is 'h1' else 'puzzleAs-h2', tic)
+            tic = time.perf_counter() - tic
+            self.__store_cache__(heuristic_type != 'h2')
+            self.__save_result__('puzzleHDAs-' + heuristic_type, tic)
+        return self.__finish_metrics__(metrics)
+
+    # Layered Breadth-First Search
+    # A true breadth-first search, one whole layer at a time, that always returns a shortest path. Only the
+    # previous, current and next layers are kept as sets of packed boards (no nodes, no parent pointers),
+    # the path is recovered by backtracking through the older layers packed into sorted buffers
+    # `memory` bounds the boards generated in memory at a time, above it the layers spill to sorted files
+    # in a temporary directory under `directory` (see FrontierSearch)
+    # `iteration` is the maximum number of expanded nodes
+    def search_LayeredBFS(self, iteration, memory=None, directory=None):
+        self.__log__('\nStarting search using layered BFS......')
+        tic = time.perf_counter()
+        self.__start_budget__()
+        metrics = self.__new_metrics__('LayeredBFS')
+        self.__lookup_cache__(metrics, 'puzzleLBFS')
+        if len(self.__path):
+            return self.__finish_metrics__(metrics)
+
+        # the expanded nodes are counted by the metrics
+        def within_budget():
+            self.__steps = metrics.expansions
+            return self.__within_budget__(iteration)
+
+        search = FrontierSearch(self.__moves, memory, directory, self.__backend)
+        self.__path = search.run(self.__init_state, self.__goal_state, metrics, within_budget)[1]
+        self.__steps = metrics.expansions
+        # if no solution is found
+        if len(self.__path) == 0:
+            self.__log__('No solution found within the budget.')
+        # if solution is found, print and save the result in a file
+        else:
+            tic = time.perf_counter() - tic
+            self.__store_cache__(True)
+            self.__save_result__('puzzleLBFS', tic)
+        return self.__finish_metrics__(metrics)
+
+    # Bidirectional Breadth-First Search
+    # Searches forward from the initial state and backward from the goal state (the moves are reversible),
+    # one whole layer at a time from the side with the smaller frontier, until the two searches meet
+    # `iteration` is the maximum number of expanded nodes of both sides
+    def search_BiBFS(self, iteration):
+        self.__log__('\nStarting search using bidirectional BFS......')
+        tic = time.perf_counter()
+        self.__start_budget__()
+        metrics = self.__new_metrics__('BiBFS')
+        self.__lookup_cache__(metrics, 'puzzleBiBFS')
+        if len(self.__path):
+            return self.__finish_metrics__(metrics)
+        clock = time.perf_counter
+        profile = self.__profile
+        # visited maps the puzzle (packed board) to its node, for each direction
+        forward = {self.__init_state: State(self.__init_state, 0)}
+        backward = {self.__goal_state: State(self.__goal_state, 0)}
+        forward_layer = [forward[self.__init_state]]
+        backward_layer = [backward[self.__goal_state]]
+        # the best (forward node, backward node) pair on the same board found so far
+        meeting = None
+        if self.__init_state == self.__goal_state:
+            meeting = (forward_layer[0], backward_layer[0])
+        while meeting is None and len(forward_layer) and len(backward_layer) and self.__within_budget__(iteration):
+            # expand the smaller frontier
+            if len(forward_layer) <= len(backward_layer):
+                layer, visited, other = forward_layer, forward, backward
+            else:
+                layer, visited, other = backward_layer, backward, forward
+            next_layer = []
+            best = float('inf')
+            for current_state in layer:
+                if not self.__within_budget__(iteration):
+                    break
+                if profile:
+                    start = clock()
+                children = self.__find_possible_states__(current_state.get_state(), current_state.get_blank())
+                if profile:
+                    metrics.successor_time += clock() - start
+                metrics.generations += len(children)
+                for state, blank in children:
+                    if state in visited:
+                        metrics.duplicates += 1
+                        continue
+                    new_state = State(state, current_state.get_depth() + 1, current_state, blank)
+                    visited[state] = new_state
+                    next_layer.append(new_state)
+                    # the searches meet, keep the shortest connection of this layer
+                    if state in other and new_state.get_depth() + other[state].get_depth() < best:
+                        best = new_state.get_depth() + other[state].get_depth()
+                        meeting = (new_state, other[state]) if visited is forward else (other[state], new_state)
+                self.__steps += 1
+                # the open lists are the frontiers, the closed lists are the boards seen from both sides
+                metrics.expand(len(forward_layer) + len(backward_layer) + len(next_layer), len(forward) + len(backward))
+            if visited is forward:
+                forward_layer = next_layer
+            else:
+                backward_layer = next_layer
+        # if no solution is found
+        if meeting is None:
+            self.__log__('No solution found within the budget.')
+        # if solution is found, join both halves, print and save the result in a file
+        else:
+            self.__create_path__(meeting[0], meeting[1])
+            tic = time.perf_counter() - tic
+            self.__store_cache__(True)
+            self.__save_result__('puzzleBiBFS', tic)
+        return self.__finish_metrics__(metrics)
 
-    # getter for path
+    # Bidirectional A* Algorithm Search (front-to-end)
+    # A forward A* towards the goal state and a backward A* towards the initial state, the side with the
+    # lower f(n) expands next. Every time a child is known to the other side, the path through it is a candidate.
+    # The search stops when the best candidate costs no more than the larger of both sides' lowest f(n),
+    # which no path still to be found can beat when h(n) is admissible.
+    # `heuristic_type` takes either `h1` or `h2` (the pattern database only estimates the distance to the goal)
+    # `iteration` is the maximum number of expanded nodes of both sides
+    def search_BiAstar(self, heuristic_type, iteration):
+        self.__log__('\nStarting heuristic search using bidirectional A* with ' + heuristic_type + '......')
+        tic = time.perf_counter()
+        self.__start_budget__()
+        metrics = self.__new_metrics__('BiA*')
+        clock = time.perf_counter
+        profile = self.__profile
+        if heuristic_type == 'pdb':
+            raise ValueError('The pattern database heuristic only works towards the goal state')
+        # a lower bound from the cache proves a path costing it shortest
+        cached_bound = self.__lookup_cache__(metrics, 'puzzleBiAs-' + heuristic_type)
+        if len(self.__path):
+            return self.__finish_metrics__(metrics)
+        # the backward search uses the same heuristic function towards the initial state
+        init_position = [0] * len(self.__init_state)
+        for idx, tile in enumerate(self.__init_state):
+            init_position[tile] = idx
+        sides = []
+        for root, position in [(self.__init_state, self.__goal_position), (self.__goal_state, init_position)]:
+            heuristic = Heuristic.create(heuristic_type, position, self.__width)
+            h = heuristic.evaluate(root)
+            node = State(root, 0, heuristic=h)
+            # (heuristic, open list (binary heap), best g(n) per board, best node per board)
+            sides.append((heuristic, [(h, h, 0, node)], {root: 0}, {root: node}))
+        order = 0
+        # the cost of the best path found so far and its (forward node, backward node) pair
+        best = float('inf')
+        meeting = None
+        # the best path is proven shortest, by the termination test or by a side running out of boards
+        proven = False
+        if self.__init_state == self.__goal_state:
+            best = 0
+            meeting = (sides[0][3][self.__init_state], sides[1][3][self.__goal_state])
+        while len(sides[0][1]) and len(sides[1][1]) and self.__within_budget__(iteration):
+            # the lowest f(n) of each side bounds every path not found yet
+            if best <= max(sides[0][1][0][0], sides[1][1][0][0], cached_bound):
+                proven = True
+                break
+            direction = 0 if sides[0][1][0][0] <= sides[1][1][0][0] else 1
+            heuristic, open_list, best_g, nodes = sides[direction]
+            other_g, other_nodes = sides[1 - direction][2], sides[1 - direction][3]
+            if profile:
+                start = clock()
+            current_state = heapq.heappop(open_list)[3]
+            if profile:
+                metrics.queue_time += clock() - start
+            # skip stale entries that were superseded by a cheaper path
+            if current_state.get_g() > best_g[current_state.get_state()]:
+                continue
+            new_evaluation = current_state.get_g() + 1
+            parent = current_state.get_state()
+            if profile:
+                start = clock()
+            children = self.__find_possible_states__(parent, current_state.get_blank())
+            if profile:
+                metrics.successor_time += clock() - start
+            metrics.generations += len(children)
+            for state, blank in children:
+                if new_evaluation >= best_g.get(state, new_evaluation + 1):
+                    metrics.duplicates += 1
+                    continue
+                best_g[state] = new_evaluation
+                if profile:
+                    start = clock()
+                h = heuristic.update(parent, current_state.get_blank(), blank, current_state.get_h())
+                if profile:
+                    metrics.heuristic_time += clock() - start
+                new_state = State(state, current_state.get_depth() + 1, current_state, blank, h)
+                new_state.set_g(new_evaluation)
+                nodes[state] = new_state
+                order += 1
+                if profile:
+                    start = clock()
+                heapq.heappush(open_list, (new_evaluation + h, h, order, new_state))
+                if profile:
+                    metrics.queue_time += clock() - start
+                # the searches meet on this board
+                if state in other_g and new_evaluation + other_g[state] < best:
+                    best = new_evaluation + other_g[state]
+                    meeting = (new_state, other_nodes[state]) if direction == 0 else (other_nodes[state], new_state)
+            self.__steps += 1
+            metrics.expand(len(sides[0][1]) + len(sides[1][1]), len(sides[0][2]) + len(sides[1][2]))
+        if not len(sides[0][1]) or not len(sides[1][1]):
+            proven = True
+        # if no solution is found, a path not found yet costs at least the larger of both sides' lowest f(n)
+        if meeting is None:
+            if len(sides[0][1]) and len(sides[1][1]):
+                self.__store_cache__(heuristic_type != 'h2', max(sides[0][1][0][0], sides[1][1][0][0], cached_bound))
+            self.__log__('No solution found within the budget.')
+        # if solution is found, join both halves, print and save the result in a file
+        else:
+            self.__create_path__(meeting[0], meeting[1])
+            tic = time.perf_counter() - tic
+            # a meeting found when the budget ran out may not be the shortest path, with the admissible `h1` it
+            # costs at most best / (the larger of both sides' lowest f(n)) times the shortest one
+            if heuristic_type != 'h2':
+                metrics.suboptimality = 1.0 if proven else \
+                    best / max(sides[0][1][0][0], sides[1][1][0][0], cached_bound, 1)
+            if not proven:
+                self.__log__('The path is not proven to be the shortest, the budget ran out.')
+            self.__store_cache__(heuristic_type != 'h2' and proven)
+            self.__save_result__('puzzleBiAs-' + heuristic_type, tic)
+        return self.__finish_metrics__(metrics)
+
+    # getter for the number of expanded nodes of the last search
+    def get_steps(self):
+        return self.__steps
+
+    # getter for path, each state is unpacked back to a list of rows
     def get_path(self):
-        return self.__path
+        return [self.__convert_state__(state, self.__width) for state in self.__restore_path__()]
+
+    # start the clock of the `timeout` budget
+    def __start_budget__(self):
+        self.__deadline = None if self.__timeout is None else time.perf_counter() + self.__timeout
+
+    # check if the `timeout` of the search ran out
+    def __past_deadline__(self):
+        return self.__deadline is not None and time.perf_counter() >= self.__deadline
+
+    # check if the search can expand one more node within `iteration` and `timeout`
+    def __within_budget__(self, iteration):
+        if self.__steps >= iteration:
+            return False
+        return self.__deadline is None or time.perf_counter() < self.__deadline
+
+    # create the metrics of a search
+    def __new_metrics__(self, algorithm):
+        return SearchMetrics(algorithm, self.__progress)
+
+    # stop the clock of the metrics of a search and return them
+    def __finish_metrics__(self, metrics):
+        metrics.stop(self.__path)
+        return metrics
+
+    # look up the instance in the cache, if it is solved the cached path becomes the result of the search
+    # returns the lower bound of the cost known from earlier searches (0 if none): IDA* starts its rounds from it,
+    # WA*, ARA* and BiA* prove a path costing it shortest, the other searches prove their paths by themselves
+    def __lookup_cache__(self, metrics, name):
+        if self.__cache is None:
+            return 0
+        if not isinstance(self.__cache, SolutionCache):
+            self.__cache = SolutionCache(self.__cache)
+        entry = self.__cache.get(self.__width, self.__height, self.__moves.get_move_set(), self.__init_state,
+                                 self.__goal_state)
+        if entry is None:
+            return 0
+        path, bound = entry
+        if path is not None:
+            self.__path = path
+            metrics.cached = True
+            self.__log__('Solution found in the cache.')
+            self.__save_result__(name, 0.0)
+        return bound
+
+    # store the result of a search in the cache
+    # `optimal` is whether the search only returns shortest paths (`h2` isn't admissible, so A* with it isn't)
+    # `bound` is a proven lower bound of the cost, stored when no solution is found
+    def __store_cache__(self, optimal, bound=None):
+        if self.__cache is None or not optimal:
+            return
+        if len(self.__path):
+            self.__cache.put_solution(self.__width, self.__height, self.__moves.get_move_set(), self.__path)
+        elif bound is not None and bound > 0:
+            self.__cache.put_bound(self.__width, self.__height, self.__moves.get_move_set(), self.__init_state,
+                                   self.__goal_state, bound)
+
+    # print progress and results unless the solver is quiet
+    def __log__(self, message):
+        if self.__verbose:
+            print(message, file=self.__log_stream)
+
+    # create the heuristic function of a search, the pattern database is loaded (memory-mapped) once per Solver
+    def __create_heuristic__(self, heuristic_type):
+        if heuristic_type != 'pdb':
+            return Heuristic.create(heuristic_type, self.__goal_position, self.__width)
+        if not isinstance(self.__pattern_database, PatternDatabase):
+            self.__pattern_database = PatternDatabase.load(self.__pattern_database, self.__goal_position, self.__width,
+                                                           self.__moves.get_move_set())
+        return self.__pattern_database
 
     # convert a list of puzzle to a new list of lists where the size equals to the height of the puzzle
     # i.e [1,2,3,4,5,6,7,0] ->
     # [[1,2,3,4],[5,6,7,0]] for 4x2
     def __convert_state__(self, state, width):
-        converted_state = [state[tile:tile+width] for tile in range(0, len(state), width)]
+        converted_state = [list(state[tile:tile+width]) for tile in range(0, len(state), width)]
         return converted_state
 
+    # pack a list of tiles into a flat `bytes` board, i.e. [1,2,3,0] -> b'\x01\x02\x03\x00'
+    # tiles must fit in one byte, which covers any puzzle up to 256 tiles
+    def __pack_state__(self, state):
+        return bytes(state)
+
     # This method is to find out all the possible moves based on the current state
-    # Only returns the state without any info of the search (i.e. h1, h2, depth etc.)
-    def __find_possible_states__(self, state):
-        next_states = []
-        # locate blank 0
-        blank_x = -1
-        blank_y = -1
-        for row_idx, row in enumerate(state):
-            if 0 in row:
-                blank_x = row_idx
-                blank_y = row.index(0)
-        # UP > UP –RIGHT > RIGHT > DOWN- RIGHT > DOWN > DOWN –LEFT > LEFT > UP–LEFT
-        # (most preferred moves)  > (least preferred moves)
-        move_position = [
-            {
-                'exist': blank_x < len(state) - 1,
-                'position': [1, 0]
-            },
-            {
-                'exist': blank_x < len(state) - 1 and blank_y > 0,
-                'position': [1, -1]
-            },
-            {
-                'exist': blank_y > 0,
-                'position': [0, -1]
-            },
-            {
-                'exist': blank_x > 0 and blank_y > 0,
-                'position': [-1, -1]
-            },
-            {
-                'exist': blank_x > 0,
-                'position': [-1, 0]
-            },
-            {
-                'exist': blank_x > 0 and blank_y < len(state[0]) - 1,
-                'position': [-1, 1]
-            },
-            {
-                'exist': blank_y < len(state[0]) - 1,
-                'position': [0, 1]
-            },
-            {
-                'exist': blank_x < len(state) - 1 and blank_y < len(state[0]) - 1,
-                'position': [1, 1]
-            }
-        ]
-        # generate states of possible moves
-        for move in move_position:
-            if move['exist']:
-                new_state = copy.deepcopy(state)
-                new_state[blank_x][blank_y] = state[blank_x + move['position'][0]][blank_y + move['position'][1]]
-                new_state[blank_x + move['position'][0]][blank_y + move['position'][1]] = 0
-                next_states.append(new_state)
-        return next_states
+    # Only returns the (state, blank index) pairs without any info of the search (i.e. h1, h2, depth etc.)
+    # The neighbours of the blank come from the move table, in the order of MoveTable.MOVES
+    def __find_possible_states__(self, state, blank):
+        swaps = MoveTable.SWAPS
+        return [(state.translate(swaps[state[target]]), target) for target in self.__moves.get_targets(blank)]
 
     # create the path of the solution
-    def __create_path__(self, state):
+    # `backward` is the node of a backward search on the same board as `state`, its ancestors lead to the goal
+    def __create_path__(self, state, backward=None):
         while state.get_parent():
             self.__path.append(state.get_state())
             state = state.get_parent()
         self.__path.append(state.get_state())
         self.__path.reverse()
+        while backward is not None and backward.get_parent():
+            backward = backward.get_parent()
+            self.__path.append(backward.get_state())
 
     # print and save method
     def __save_result__(self, name, time):
-        print('The puzzle is solved after ' + str(time))
-        print('Solution path: ' + str(len(self.__path)) + ' steps.')
-        print('Searched nodes: ' + str(self.__steps))
-        with open(name + '.txt', 'w+') as file:
-            file.write(name)
-            file.write('\n\nInitial State:')
-            for row in self.__init_state:
-                file.write('\n' + str(row))
-            file.write('\n\nGoal State:')
-            for row in self.__goal_state:
-                file.write('\n' + str(row))
-            file.write('\n\nPuzzle solution path:')
-            for state in self.__path:
-                file.write('\n--------------------')
-                for row in state:
-                    file.write('\n' + str(row))
-            file.write('\n--------------------')
-            file.write('\n\nThe puzzle is solved after ' + str(time))
-            file.write('\nShortest path: ' + str(len(self.__path)) + ' steps.')
-            file.write('\nSearched nodes: ' + str(self.__steps) + '.')
-
-
+        if self.__verbose:
+            print('The puzzle is solved after ' + str(time), file=self.__log_stream)
+            print('Solution path: ' + str(len(self.__path)) + ' steps.', file=self.__log_stream)
+            print('Searched nodes: ' + str(self.__steps), file=self.__log_stream)
+        self.__sink.write(name, self.__width, self.__instance[0], self.__instance[1], self.__restore_path__(), time,
+                          self.__steps)
 
+    # the path of the instance as given, mapped back from the canonical instance
+    def __restore_path__(self):
+        if self.__symmetry is None:
+            return self.__path
+        return [self.__symmetry.restore(state) for state in self.__path]
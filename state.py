@@ -2,37 +2,25 @@
 """
 state.py is the model of puzzle state node
 """
-import itertools
 
 
 class State:
 
-    def __init__(self, state, goal_state, depth, parent=None):
+    # the board is a flat `bytes` (one byte per tile, row by row), so a node is small and hashable
+    __slots__ = ('__state', '__depth', '__parent', '__blank', '__heuristic', '__evaluation')
+
+    def __init__(self, state, depth, parent=None, blank=None, heuristic=0):
         self.__state = state
-        self.__goal_state = goal_state
         self.__depth = depth
         self.__parent = parent
-        self.__heuristic = 0
+        # index of the blank 0 on the flat board, cached so successors don't have to look for it
+        self.__blank = state.index(0) if blank is None else blank
+        # h(n), computed by the search with heuristic.py (from scratch for the root, as a delta for children)
+        self.__heuristic = heuristic
         self.__evaluation = 0
 
-    # calculate and get the hamming distance of this node
-    def get_h1(self):
-        current_state = list(itertools.chain.from_iterable(self.__state))
-        goal_state = list(itertools.chain.from_iterable(self.__goal_state))
-        for tile in current_state:
-            if tile != 0 and tile != goal_state[current_state.index(tile)]:
-                self.__heuristic += 1
-        return self.__heuristic
-
-    # calculate and get the sum of permutation of this node
-    def get_h2(self):
-        current_state = list(itertools.chain.from_iterable(self.__state))
-        goal_state = list(itertools.chain.from_iterable(self.__goal_state))
-        for tile in current_state:
-            if tile != 0:
-                for t in current_state[current_state.index(tile)+1:]:
-                    if t != 0 and goal_state.index(t) < goal_state.index(tile):
-                        self.__heuristic += 1
+    # get method for h(n)
+    def get_h(self):
         return self.__heuristic
 
     # get method for f(n)
@@ -52,6 +40,9 @@ class State:
     def get_state(self):
         return self.__state
 
+    def get_blank(self):
+        return self.__blank
+
     def get_depth(self):
         return self.__depth
 
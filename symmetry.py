@@ -0,0 +1,76 @@
+# -*- coding:utf8 -*-
+"""
+symmetry.py maps a puzzle to its canonical form by relabeling the tiles and applying the symmetries of the board
+"""
+
+
+class Symmetry:
+
+    # `cells` is the permutation of the cells of the symmetry: the tile on cell i moves to cells[i]
+    # `tiles` maps the canonical labels back to the tiles: tiles[label] is the original tile
+    def __init__(self, cells, tiles):
+        self.__cells = cells
+        self.__tiles = tiles
+
+    # the permutations of the cells that map the board onto itself
+    # both move sets are invariant under them, a diagonal stays a diagonal and an orthogonal move stays orthogonal
+    # - every board: identity, horizontal and vertical reflections and the half turn
+    # - square boards: also both diagonal reflections and the quarter turns
+    @staticmethod
+    def transforms(width, height):
+        maps = [lambda x, y: (x, y),
+                lambda x, y: (width - 1 - x, y),
+                lambda x, y: (x, height - 1 - y),
+                lambda x, y: (width - 1 - x, height - 1 - y)]
+        if width == height:
+            maps += [lambda x, y: (y, x),
+                     lambda x, y: (height - 1 - y, width - 1 - x),
+                     lambda x, y: (height - 1 - y, x),
+                     lambda x, y: (y, width - 1 - x)]
+        transforms = []
+        for transform in maps:
+            cells = []
+            for idx in range(width * height):
+                x, y = transform(idx % width, idx // width)
+                cells.append(y * width + x)
+            transforms.append(cells)
+        return transforms
+
+    # the canonical form of the instance (`init_state`, `goal_state`), both packed boards
+    # every symmetry of the board is applied, then the tiles are relabeled so the goal reads 1, 2, 3 ... in order
+    # with the blank (0) left where it is. The canonical form has the goal blank on the lowest cell, then the
+    # smallest initial state. Instances differing by a symmetry or by the labels of their tiles share it
+    # returns the Symmetry, the canonical initial state and the canonical goal state
+    @staticmethod
+    def canonicalize(init_state, goal_state, width, height):
+        best = None
+        for cells in Symmetry.transforms(width, height):
+            init = bytearray(len(init_state))
+            goal = bytearray(len(goal_state))
+            for idx, cell in enumerate(cells):
+                init[cell] = init_state[idx]
+                goal[cell] = goal_state[idx]
+            # the non-blank tiles of the goal get the labels 1, 2, 3 ... in cell order
+            labels = [0] * len(goal)
+            tiles = [0] * len(goal)
+            label = 0
+            for tile in goal:
+                if tile:
+                    label += 1
+                    labels[tile] = label
+                    tiles[label] = tile
+            key = (goal.index(0), bytes(labels[tile] for tile in init))
+            if best is None or key < best[0]:
+                best = (key, cells, tiles, bytes(labels[tile] for tile in goal))
+        (_, init), cells, tiles, goal = best
+        return Symmetry(cells, tiles), init, goal
+
+    # the canonical goal state of a goal state, i.e. to build the pattern database shared by its instances
+    @staticmethod
+    def canonical_goal(goal_state, width, height):
+        return Symmetry.canonicalize(goal_state, goal_state, width, height)[2]
+
+    # map a board of the canonical instance back to the original instance
+    def restore(self, board):
+        tiles = self.__tiles
+        return bytes(tiles[board[cell]] for cell in self.__cells)
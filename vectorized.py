@@ -0,0 +1,108 @@
+# -*- coding:utf8 -*-
+"""
+vectorized.py contains the optional NumPy backend expanding and evaluating batches of boards at once
+"""
+from pattern_database import PatternDatabase
+
+# NumPy is imported by the first VectorBackend, so the python backend does not pay for it
+numpy = None
+
+
+class VectorBackend:
+
+    # a batch of boards is a 2-D uint8 array, one packed board per row
+    # `moves` is the MoveTable of the puzzle, `goal_position` the goal-position table of the Solver
+    def __init__(self, moves, goal_position):
+        global numpy
+        if numpy is None:
+            try:
+                import numpy
+            except ImportError:
+                raise ImportError('The numpy backend needs NumPy (pip install numpy)')
+        cells = len(goal_position)
+        self.__cells = cells
+        # permutations[blank] is the list of (target, column permutation) pairs of a blank position,
+        # indexing the columns of a board by the permutation slides the tile at `target` into the blank
+        self.__permutations = []
+        for blank in range(cells):
+            pairs = []
+            for target in moves.get_targets(blank):
+                permutation = numpy.arange(cells)
+                permutation[blank], permutation[target] = target, blank
+                pairs.append((target, permutation))
+            self.__permutations.append(pairs)
+        self.__goal_position = numpy.array(goal_position, dtype=numpy.int16)
+        self.__goal_state = numpy.argsort(self.__goal_position).astype(numpy.uint8)
+        # pairs (i, j) with i < j, for the sum of permutation
+        self.__upper = numpy.triu(numpy.ones((cells, cells), dtype=bool), 1)
+        # boards of at most 16 tiles are packed into one integer, 4 bits per tile with the first tile highest,
+        # so the integers sort like the `bytes` boards
+        self.__shifts = None
+        if cells <= 16:
+            self.__shifts = numpy.arange(4 * (cells - 1), -1, -4, dtype=numpy.uint64)
+
+    # a batch of the packed boards stored back to back in `buffer`, i.e. b''.join(states)
+    def to_array(self, buffer):
+        return numpy.frombuffer(buffer, dtype=numpy.uint8).reshape(-1, self.__cells)
+
+    # unpack a batch into a list of `bytes` boards
+    def to_states(self, boards):
+        buffer = boards.tobytes()
+        cells = self.__cells
+        return [buffer[idx:idx+cells] for idx in range(0, len(buffer), cells)]
+
+    # generate the children of every board of a batch, grouped by the position of the blank
+    # returns the children, the row of each child's parent and the index the blank moved to (the child's blank)
+    def expand(self, boards):
+        blanks = (boards == 0).argmax(axis=1)
+        children, parents, targets = [], [], []
+        for blank in numpy.unique(blanks):
+            rows = numpy.nonzero(blanks == blank)[0]
+            group = boards[rows]
+            for target, permutation in self.__permutations[blank]:
+                children.append(group[:, permutation])
+                parents.append(rows)
+                targets.append(numpy.full(len(rows), target, dtype=numpy.int16))
+        if not children:
+            return numpy.empty((0, self.__cells), dtype=numpy.uint8), numpy.empty(0, dtype=numpy.intp), \
+                numpy.empty(0, dtype=numpy.int16)
+        return numpy.concatenate(children), numpy.concatenate(parents), numpy.concatenate(targets)
+
+    # the heuristic values of a batch, `heuristic` is `h1`, `h2` or a PatternDatabase
+    def evaluate(self, boards, heuristic):
+        if heuristic == 'h1':
+            return ((boards != self.__goal_state) & (boards != 0)).sum(axis=1)
+        if heuristic == 'h2':
+            goals = self.__goal_position[boards]
+            tiles = boards != 0
+            inversions = (goals[:, :, None] > goals[:, None, :]) & self.__upper & tiles[:, :, None] & tiles[:, None, :]
+            return inversions.sum(axis=(1, 2))
+        if isinstance(heuristic, PatternDatabase):
+            # positions[:, tile] is the index of the tile on each board
+            positions = numpy.argsort(boards, axis=1)
+            h = numpy.zeros(len(boards), dtype=numpy.int64)
+            for group, table in zip(heuristic.get_groups(), heuristic.get_tables()):
+                weights = self.__cells ** numpy.arange(len(group), dtype=numpy.int64)
+                h += numpy.frombuffer(table, dtype=numpy.uint8)[positions[:, group] @ weights]
+            return h
+        raise ValueError('Unknown heuristic function: ' + str(heuristic))
+
+    # the sorted distinct boards of a batch that are in none of the sorted batches `others`
+    def difference(self, boards, others):
+        keys = numpy.sort(self.__keys__(boards))
+        if len(keys):
+            keys = keys[numpy.concatenate(([True], keys[1:] != keys[:-1]))]
+        for other in others:
+            other = self.__keys__(other)
+            if len(other):
+                found = other[numpy.minimum(numpy.searchsorted(other, keys), len(other) - 1)] == keys
+                keys = keys[~found]
+        if self.__shifts is not None:
+            return ((keys[:, None] >> self.__shifts) & numpy.uint64(15)).astype(numpy.uint8)
+        return keys.view(numpy.uint8).reshape(-1, self.__cells)
+
+    # turn each board into one value ordered like the `bytes` boards, an integer when it fits or an opaque value
+    def __keys__(self, boards):
+        if self.__shifts is not None:
+            return numpy.bitwise_or.reduce(boards.astype(numpy.uint64) << self.__shifts, axis=1)
+        return numpy.ascontiguousarray(boards).view(numpy.dtype((numpy.void, self.__cells))).ravel()